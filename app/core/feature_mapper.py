@@ -1,55 +1,145 @@
-from typing import Callable, Dict, Any
+import threading
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Dict, Any, Optional, Tuple
+import numpy as np
 from app.models.schemas import RentPredictionRequest
 from app.core.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# 特徴量のデフォルト値
+DEFAULT_VALUES = {
+  "management_fee": 0.0,    # 0万円
+  "total_units": 0          # 0戸
+}
+
+# 特徴量の取得関数マッピング（config.jsonの特徴量名に統一）
+FEATURE_EXTRACTORS: Dict[str, Callable[[RentPredictionRequest], Any]] = {
+  name: attrgetter(name)
+  for name in ("area", "age", "layout", "station_person", "management_fee", "total_units")
+}
+
+# 抽出関数（取得関数と未入力（None）の場合のデフォルト値の組）
+Extractor = Tuple[Callable[[RentPredictionRequest], Any], Any]
+
+def _missing(request: RentPredictionRequest) -> None:
+  """モデルが期待する特徴量数に満たない分を埋めるための取得関数"""
+  return None
+
+# 不足分の特徴量（常に0）
+_PADDING_EXTRACTOR: Extractor = (_missing, 0.0)
+
+# スレッドごとの入力バッファ（全特徴量分を一度だけ確保し、先頭の必要な列をビューとして使う）
+_buffers = threading.local()
+MAX_FEATURES = len(FEATURE_EXTRACTORS)
+
+def _get_buffer(n_features: int) -> np.ndarray:
+  """現在のスレッド用の (1, n_features) float32 バッファを取得"""
+  buf = getattr(_buffers, "buf", None)
+  if buf is None or buf.shape[1] < n_features:
+    buf = _buffers.buf = np.empty((1, max(n_features, MAX_FEATURES)), dtype=np.float32)
+  return buf[:, :n_features]
+
+@lru_cache(maxsize=32)
+def _compile_extractors(feature_names: Tuple[str, ...], n_features: Optional[int] = None) -> Tuple[Extractor, ...]:
+  """
+  特徴量リストに対応する抽出関数のタプルを生成（特徴量リストごとにキャッシュ）
+
+  n_features を指定した場合は、不足分を0で埋める抽出関数を追加するか末尾を切り捨て、
+  抽出結果がそのままモデルの入力形状になるようにする。
+
+  Args:
+    feature_names: 抽出する特徴量のタプル
+    n_features: モデルが期待する特徴量数
+
+  Returns:
+    Tuple: (取得関数, デフォルト値) のタプル
+
+  Raises:
+    ValueError: 不明な特徴量が指定された場合
+  """
+  for feature in feature_names:
+    if feature not in FEATURE_EXTRACTORS:
+      raise ValueError(f"不明な特徴量: {feature}")
+  extractors = tuple((FEATURE_EXTRACTORS[feature], DEFAULT_VALUES.get(feature)) for feature in feature_names)
+  if n_features is None or n_features == len(extractors):
+    return extractors
+  if n_features > len(extractors):
+    logger.warning("特徴量数が不足しているため、%s個の0を追加します", n_features - len(extractors))
+    return extractors + (_PADDING_EXTRACTOR,) * (n_features - len(extractors))
+  logger.warning("特徴量数が多すぎるため、%s個を切り捨てます", len(extractors) - n_features)
+  return extractors[:n_features]
+
 class FeatureMapper:
   """特徴量マッピングを管理するクラス"""
 
-  # 特徴量のデフォルト値
-  DEFAULT_VALUES = {
-    "management_fee": 0.0,    # 0万円
-    "total_units": 0          # 0戸
-  }
-
-  # 特徴量の抽出関数マッピング（config.jsonの特徴量名に統一）
-  FEATURE_EXTRACTORS: Dict[str, Callable[[RentPredictionRequest], Any]] = {
-    "area": lambda req: req.area,
-    "age": lambda req: req.age,
-    "layout": lambda req: req.layout,
-    "station_person": lambda req: req.station_person,
-    "management_fee": lambda req: req.management_fee or FeatureMapper.DEFAULT_VALUES["management_fee"],
-    "total_units": lambda req: req.total_units or FeatureMapper.DEFAULT_VALUES["total_units"]
-  }
+  DEFAULT_VALUES = DEFAULT_VALUES
+  FEATURE_EXTRACTORS = FEATURE_EXTRACTORS
 
   @classmethod
-  def extract_features(cls, request: RentPredictionRequest, feature_list: list) -> list:
+  def compile_extractors(cls, feature_list: list, n_features: Optional[int] = None) -> Tuple[Extractor, ...]:
+    """
+    特徴量リストを検証し、抽出関数のタプルに変換
+
+    モデルごとに一度だけ呼び出し、結果を extract_with に渡して使い回す。
+
+    Args:
+      feature_list: 抽出する特徴量のリスト
+      n_features: モデルが期待する特徴量数（指定した場合は0埋め・切り捨てを行う）
+
+    Returns:
+      Tuple: (取得関数, デフォルト値) のタプル
+
+    Raises:
+      ValueError: 不明な特徴量が指定された場合
+    """
+    return _compile_extractors(tuple(feature_list), n_features)
+
+  @classmethod
+  def extract_with(cls, request: RentPredictionRequest, extractors: Tuple[Extractor, ...]) -> np.ndarray:
+    """
+    事前に生成した抽出関数でリクエストから特徴量を抽出
+
+    返される配列はスレッドごとに再利用されるバッファのため、
+    同じスレッドで次に呼び出すまでに使い終えること（必要ならコピーする）。
+
+    Args:
+      request: 予測リクエスト
+      extractors: compile_extractors で生成した抽出関数のタプル
+
+    Returns:
+      np.ndarray: 特徴量値の配列（形状 (1, 特徴量数)、float32）
+    """
+    buf = _get_buffer(len(extractors))
+    try:
+      for i, (getter, default) in enumerate(extractors):
+        value = getter(request)
+        buf[0, i] = default if value is None else value
+      return buf
+    except Exception as e:
+      logger.error("特徴量の抽出に失敗: %s", e)
+      raise
+
+  @classmethod
+  def extract_features(cls, request: RentPredictionRequest, feature_list: list) -> np.ndarray:
     """
     リクエストから指定された特徴量を抽出
-    
+
+    返される配列はスレッドごとに再利用されるバッファのため、
+    同じスレッドで次に呼び出すまでに使い終えること（必要ならコピーする）。
+
     Args:
       request: 予測リクエスト
       feature_list: 抽出する特徴量のリスト
-    
+
     Returns:
-      list: 特徴量値のリスト
-    
+      np.ndarray: 特徴量値の配列（形状 (1, 特徴量数)、float32）
+
     Raises:
       ValueError: 不明な特徴量が指定された場合
     """
-    feature_values = []
-    for feature in feature_list:
-      if feature not in cls.FEATURE_EXTRACTORS:
-        raise ValueError(f"不明な特徴量: {feature}")
-      try:
-        value = cls.FEATURE_EXTRACTORS[feature](request)
-        feature_values.append(value)
-        logger.debug(f"特徴量 '{feature}' の値を抽出: {value}")
-      except Exception as e:
-        logger.error(f"特徴量 '{feature}' の抽出に失敗: {e}")
-        raise
-    return feature_values
+    return cls.extract_with(request, cls.compile_extractors(feature_list))
 
   @classmethod
   def get_available_features(cls) -> list:
@@ -62,6 +152,6 @@ class FeatureMapper:
     available_features = cls.get_available_features()
     invalid_features = [f for f in feature_list if f not in available_features]
     if invalid_features:
-      logger.error(f"無効な特徴量: {invalid_features}")
+      logger.error("無効な特徴量: %s", invalid_features)
       return False
-    return True 
+    return True
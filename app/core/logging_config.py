@@ -1,26 +1,65 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+# 標準出力への書き込みを行うバックグラウンドスレッド（リクエスト処理のスレッドでI/Oを行わない）
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+
+class _HealthCheckAccessFilter(logging.Filter):
+  """ヘルスチェック（/health）へのアクセスログを出力しない"""
+  def filter(self, record: logging.LogRecord) -> bool:
+    # uvicorn のアクセスログの引数は (クライアント, メソッド, パス, HTTPバージョン, ステータス)
+    args = record.args
+    return not (isinstance(args, tuple) and len(args) >= 3 and args[2] == "/health")
 
 def setup_logging() -> None:
   """アプリケーション全体のログ設定を初期化"""
+  global _queue_listener, _queue_handler
+  if _queue_listener is not None:
+    return
   # ログフォーマットの設定
   log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
   date_format = "%Y-%m-%d %H:%M:%S"
+  stream_handler = logging.StreamHandler(sys.stdout)
+  stream_handler.setFormatter(logging.Formatter(log_format, date_format))
+  # ログレコードはキューに積むだけにし、フォーマットと書き込みはリスナーのスレッドで行う
+  log_queue: queue.SimpleQueue = queue.SimpleQueue()
+  _queue_listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+  _queue_listener.start()
+  atexit.register(shutdown_logging)
+  # メッセージの埋め込みのみ行い、日時などの付与は書き込み側のフォーマッタに任せる
+  queue_handler = _queue_handler = logging.handlers.QueueHandler(log_queue)
+  queue_handler.setFormatter(logging.Formatter("%(message)s"))
   # ルートロガーの設定
   logging.basicConfig(
     level=logging.INFO,
-    format=log_format,
-    datefmt=date_format,
-    handlers=[
-      logging.StreamHandler(sys.stdout)
-    ]
+    handlers=[queue_handler]
   )
   # 特定のライブラリのログレベルを調整
   logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
+  logging.getLogger("uvicorn.access").addFilter(_HealthCheckAccessFilter())
   logging.getLogger("tensorflow").setLevel(logging.WARNING)
   logging.getLogger("sklearn").setLevel(logging.WARNING)
 
+def shutdown_logging() -> None:
+  """
+  キューに残っているログを書き出し、リスナーを停止
+
+  ルートロガーからキューへのハンドラーも取り外すため、停止後のログが消費されないキューに
+  溜まることはなく、setup_logging を再度呼び出せば書き込みを再開できる。
+  """
+  global _queue_listener, _queue_handler
+  if _queue_handler is not None:
+    logging.getLogger().removeHandler(_queue_handler)
+    _queue_handler = None
+  if _queue_listener is not None:
+    _queue_listener.stop()
+    _queue_listener = None
+
 def get_logger(name: str) -> logging.Logger:
   """指定された名前のロガーを取得"""
   return logging.getLogger(name)
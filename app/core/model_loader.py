@@ -1,27 +1,240 @@
 import tensorflow as tf
-import joblib
+import numpy as np
+import functools
+import gc
 import os
-import json
-from typing import Tuple, Dict, Any, Optional
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Hashable, List, Tuple, Dict, Optional
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from app.models.schemas import RentPredictionRequest
-from app.models.config import ModelInfo, AppConfig
+from app.models.config import ModelConfig, ModelInfo, AppConfig
 from app.core.logging_config import get_logger
+from app.core.predictors import Predictor, DensePredictor, GraphPredictor, SavedModelPredictor, TFLitePredictor
+from app.core.stacked_model import StackedRegionPredictor, build_stacked_predictor, extract_dense_stack
 
 logger = get_logger(__name__)
 
-# モデルキャッシュ
-_model_cache: Dict[str, tf.keras.Model] = {}
-_scaler_cache: Dict[str, Any] = {}
+# 推論スレッド数（環境変数で変更可能。既定はバッチサイズ1の推論に適した1スレッド）
+# TensorFlow のランタイムが初期化された後は変更できないため、その場合は警告のみ出して現在の設定を使う
+try:
+  tf.config.threading.set_intra_op_parallelism_threads(int(os.environ.get("TF_NUM_INTRAOP_THREADS", "1")))
+  tf.config.threading.set_inter_op_parallelism_threads(int(os.environ.get("TF_NUM_INTEROP_THREADS", "1")))
+except RuntimeError as e:
+  logger.warning("TensorFlow の初期化後のため、推論スレッド数を変更できません: %s", e)
+
+class _LRUCache:
+  """容量上限付きのLRUキャッシュ（スレッドセーフ）"""
+
+  def __init__(self, maxsize: int, on_evict: Optional[Callable[[Hashable, Any], None]] = None):
+    self.maxsize = maxsize
+    self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+    self._lock = threading.Lock()
+    self._on_evict = on_evict
+
+  def get(self, key: Hashable, default: Any = None) -> Any:
+    """値を取得し、最近使用したものとして記録"""
+    with self._lock:
+      if key not in self._data:
+        return default
+      self._data.move_to_end(key)
+      return self._data[key]
+
+  def __setitem__(self, key: Hashable, value: Any) -> None:
+    evicted = []
+    with self._lock:
+      self._data[key] = value
+      self._data.move_to_end(key)
+      while len(self._data) > self.maxsize:
+        evicted.append(self._data.popitem(last=False))
+    # コールバックはロックの外で呼び出す
+    if self._on_evict is not None:
+      for evicted_key, evicted_value in evicted:
+        self._on_evict(evicted_key, evicted_value)
+
+  def __contains__(self, key: Hashable) -> bool:
+    with self._lock:
+      return key in self._data
+
+  def __len__(self) -> int:
+    with self._lock:
+      return len(self._data)
+
+  def pop(self, key: Hashable, default: Any = None) -> Any:
+    """値を削除して返す"""
+    with self._lock:
+      return self._data.pop(key, default)
+
+def _on_model_evicted(cache_key: str, model: tf.keras.Model) -> None:
+  """モデルがキャッシュから追い出された際に関連する推論関数も解放する"""
+  _predictor_cache.pop(cache_key)
+  del model
+  gc.collect()
+  logger.info("モデルをキャッシュから解放しました: %s", cache_key)
+
+# モデルキャッシュ（保持数の上限は環境変数 MODEL_CACHE_MAX_SIZE で変更可能）
+MODEL_CACHE_MAX_SIZE = int(os.environ.get("MODEL_CACHE_MAX_SIZE", "32"))
+_model_cache = _LRUCache(MODEL_CACHE_MAX_SIZE, on_evict=_on_model_evicted)
+_predictor_cache = _LRUCache(MODEL_CACHE_MAX_SIZE)
 _config_cache: Optional[AppConfig] = None
 
+# モデルタイプ -> 地域別モデルをまとめた推論関数（ウォームアップ時に構築）
+_stacked_cache: Dict[str, StackedRegionPredictor] = {}
+
+# キャッシュミス時の読み込みをキーごとに直列化するロック
+_load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_load_locks_guard = threading.Lock()
+
+def _get_load_lock(key: Tuple[str, str]) -> threading.Lock:
+  """指定されたキーの読み込み用ロックを取得"""
+  with _load_locks_guard:
+    lock = _load_locks.get(key)
+    if lock is None:
+      lock = _load_locks[key] = threading.Lock()
+    return lock
+
+# 設定ファイルの検証器（検証スキーマの構築は起動時に一度だけ行う）
+_APP_CONFIG_ADAPTER = TypeAdapter(AppConfig)
+
+# 学習済みモデルの配置ディレクトリ
+SAVED_MODELS_DIR = Path(__file__).resolve().parents[2] / "saved_models"
+
+# 基本特徴量（常に利用可能）と任意特徴量（ビット位置の順）
+BASE_FEATURES = ("area", "age", "layout", "station_person")
+OPTIONAL_FEATURES = ("management_fee", "total_units")
+
+# (地域, 任意特徴量の入力有無ビットマスク) -> モデルタイプ
+_model_type_dispatch: Dict[Tuple[str, int], str] = {}
+
+# (地域, 任意特徴量の入力有無ビットマスク) -> 選択されたモデルの情報
+_model_info_cache: Dict[Tuple[str, int], ModelInfo] = {}
+
+def _has_all_fields(value: Any) -> bool:
+  """復元した設定オブジェクトが、現在のモデル定義の全フィールドを（入れ子も含めて）持つか確認"""
+  if isinstance(value, BaseModel):
+    attributes = value.__dict__
+    if any(name not in attributes for name in type(value).model_fields):
+      return False
+    return all(_has_all_fields(attribute) for attribute in attributes.values())
+  if isinstance(value, dict):
+    return all(_has_all_fields(item) for item in value.values())
+  if isinstance(value, (list, tuple)):
+    return all(_has_all_fields(item) for item in value)
+  return True
+
+def scaler_mean_scale(scaler: Any) -> Tuple[np.ndarray, np.ndarray]:
+  """
+  StandardScaler が transform で実際に使う平均と標準偏差を取り出す
+
+  with_mean=False でも mean_ は計算されるが transform では引かれないため 0 とし、
+  with_std=False や未計算（None）の場合も変換しない値（平均 0・標準偏差 1）にする。
+
+  Args:
+    scaler: 学習済みの StandardScaler
+
+  Returns:
+    Tuple[np.ndarray, np.ndarray]: 平均と標準偏差（float32）
+  """
+  n_features = int(scaler.n_features_in_)
+  mean = getattr(scaler, "mean_", None)
+  scale = getattr(scaler, "scale_", None)
+  if not getattr(scaler, "with_mean", True) or mean is None:
+    mean = np.zeros(n_features)
+  if not getattr(scaler, "with_std", True) or scale is None:
+    scale = np.ones(n_features)
+  return np.asarray(mean, dtype=np.float32), np.asarray(scale, dtype=np.float32)
+
+def _optional_feature_mask(request: RentPredictionRequest) -> int:
+  """任意特徴量の入力有無をビットマスクに変換（ビット位置は OPTIONAL_FEATURES の順）"""
+  return (request.management_fee is not None) | ((request.total_units is not None) << 1)
+
+def _select_model_type(region_models: Dict[str, ModelConfig], available_features: set) -> str:
+  """
+  利用可能な特徴量から最適なモデルタイプを選択
+
+  Args:
+    region_models: 地域のモデル設定
+    available_features: 利用可能な特徴量の集合
+
+  Returns:
+    str: モデルタイプ
+  """
+  # 最適なモデルを選択（より多くの特徴量を使用するモデルを優先）
+  best_model = None
+  best_score = 0
+
+  for model_name, model_info in region_models.items():
+    # このモデルが使用する特徴量のうち、利用可能な特徴量の数を計算
+    model_features = set(model_info.features)
+    available_model_features = model_features.intersection(available_features)
+
+    # 必須特徴量がすべて利用可能か確認
+    required_features = set(model_info.required_features)
+    if not required_features.issubset(available_features):
+      continue
+
+    # スコアを計算（利用可能な特徴量の数）
+    score = len(available_model_features)
+
+    if score > best_score:
+      best_score = score
+      best_model = model_name
+
+  # デフォルトはbaseモデル
+  if best_model is None:
+    best_model = "base"
+  return best_model
+
+def _build_model_type_dispatch(config: AppConfig) -> Dict[Tuple[str, int], str]:
+  """
+  全地域・全ての任意特徴量の組み合わせについてモデルタイプを事前に決定
+
+  Args:
+    config: アプリケーション設定
+
+  Returns:
+    Dict[Tuple[str, int], str]: (地域, ビットマスク) からモデルタイプへの対応表
+  """
+  dispatch = {}
+  for region, region_config in config.regions.items():
+    for mask in range(1 << len(OPTIONAL_FEATURES)):
+      available_features = set(BASE_FEATURES)
+      available_features.update(
+        feature for bit, feature in enumerate(OPTIONAL_FEATURES) if mask & (1 << bit)
+      )
+      dispatch[(region, mask)] = _select_model_type(region_config.models, available_features)
+  return dispatch
+
 class ModelLoader:
   """モデルとスケーラーの読み込み・管理を行うクラス"""
 
   def __init__(self):
-    self.base_path = os.path.join(
-      os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-      "saved_models"
-    )
+    self.base_path = os.fspath(SAVED_MODELS_DIR)
+    # (地域, モデルタイプ) -> (モデルパス, スケーラーパス)（設定読み込み時に構築）
+    self._paths: Dict[Tuple[str, str], Tuple[str, str]] = {}
+
+  def _build_paths(self, config: AppConfig) -> Dict[Tuple[str, str], Tuple[str, str]]:
+    """
+    設定ファイルに記載された全モデルのファイルパスを事前に構築
+
+    Args:
+      config: アプリケーション設定
+
+    Returns:
+      Dict[Tuple[str, str], Tuple[str, str]]: (地域, モデルタイプ) からパスへの対応表
+    """
+    base = Path(self.base_path)
+    paths = {}
+    for region, region_config in config.regions.items():
+      for model_type in region_config.models:
+        model_dir = base / region / model_type
+        paths[(region, model_type)] = (
+          os.fspath(model_dir / "model.keras"),
+          os.fspath(model_dir / "scaler.npz")
+        )
+    return paths
 
   def get_model_path(self, region: str, model_type: str) -> str:
     """
@@ -34,6 +247,9 @@ class ModelLoader:
     Returns:
       str: モデルファイルのパス
     """
+    paths = self._paths.get((region, model_type))
+    if paths is not None:
+      return paths[0]
     return os.path.join(self.base_path, region, model_type, "model.keras")
 
   def get_scaler_path(self, region: str, model_type: str) -> str:
@@ -47,38 +263,83 @@ class ModelLoader:
     Returns:
       str: スケーラーファイルのパス
     """
-    return os.path.join(self.base_path, region, model_type, "scaler.pkl")
+    paths = self._paths.get((region, model_type))
+    if paths is not None:
+      return paths[1]
+    return os.path.join(self.base_path, region, model_type, "scaler.npz")
 
   def load_config(self) -> AppConfig:
     """
     設定ファイルを読み込み
+
+    scripts/freeze_config.py で作成した config.pkl が config.json より新しい場合は、
+    検証済みの設定オブジェクトをそのまま読み込む（Pydantic の検証を省略できる）。
     
     Returns:
       AppConfig: アプリケーション設定
     
     Raises:
       FileNotFoundError: 設定ファイルが見つからない場合
-      json.JSONDecodeError: 設定ファイルの形式が正しくない場合
+      ValidationError: 設定ファイルの形式が正しくない場合
     """
-    global _config_cache
+    global _config_cache, _model_type_dispatch
     if _config_cache is None:
       config_path = os.path.join(self.base_path, "config.json")
-      if not os.path.exists(config_path):
-        logger.error(f"設定ファイルが見つかりません: {config_path}")
+      frozen_path = os.path.join(self.base_path, "config.pkl")
+      has_config = os.path.exists(config_path)
+      has_frozen = os.path.exists(frozen_path)
+      if not has_config and not has_frozen:
+        logger.error("設定ファイルが見つかりません: %s", config_path)
         raise FileNotFoundError(f"設定ファイルが見つかりません: {config_path}")
       try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-          config_data = json.load(f)
-        _config_cache = AppConfig(**config_data)
+        config = None
+        if has_frozen and (not has_config or os.path.getmtime(frozen_path) >= os.path.getmtime(config_path)):
+          config = self._load_frozen_config(frozen_path)
+          if config is None and not has_config:
+            raise FileNotFoundError(f"設定ファイルが見つかりません: {config_path}")
+        if config is None:
+          with open(config_path, 'rb') as f:
+            content = f.read()
+          # JSONの解析と設定の妥当性の検証を一度に行う
+          config = _APP_CONFIG_ADAPTER.validate_json(content)
+        _model_type_dispatch = _build_model_type_dispatch(config)
+        _config_cache = config
         logger.info("設定ファイルを正常に読み込みました")
-      except json.JSONDecodeError as e:
-        logger.error(f"設定ファイルの形式が正しくありません: {e}")
+      except ValidationError as e:
+        logger.error("設定ファイルの形式が正しくありません: %s", e)
         raise
       except Exception as e:
-        logger.error(f"設定ファイルの読み込みに失敗しました: {e}")
+        logger.error("設定ファイルの読み込みに失敗しました: %s", e)
         raise
+    if not self._paths:
+      self._paths = self._build_paths(_config_cache)
     return _config_cache
 
+  def _load_frozen_config(self, frozen_path: str) -> Optional[AppConfig]:
+    """
+    config.pkl から検証済みの設定を読み込み
+
+    異なるバージョンの pydantic や古い AppConfig で作成されたファイルは、読み込みに失敗するか
+    属性が欠けた状態で復元されることがあるため、その場合は None を返して config.json を使わせる。
+
+    Args:
+      frozen_path: config.pkl のパス
+
+    Returns:
+      Optional[AppConfig]: 設定（読み込めない場合は None）
+    """
+    try:
+      with open(frozen_path, 'rb') as f:
+        config = pickle.load(f)
+      if not isinstance(config, AppConfig):
+        raise TypeError(f"AppConfig ではありません: {type(config).__name__}")
+      if not _has_all_fields(config):
+        raise ValueError("現在の AppConfig に存在するフィールドが欠けています")
+      return config
+    except Exception as e:
+      logger.warning("config.pkl を読み込めないため config.json を使用します: %s", e)
+      return None
+
   def determine_model_type(self, request: RentPredictionRequest, config: AppConfig) -> str:
     """
     入力データとconfig.jsonの情報に基づいて適切なモデルタイプを決定
@@ -90,153 +351,227 @@ class ModelLoader:
     Returns:
       str: モデルタイプ
     """
-    # 利用可能な特徴量を確認
-    available_features = set()
-    
-    # 基本特徴量は常に利用可能
-    available_features.update(["area", "age", "layout", "station_person"])
-    
-    # 任意特徴量の確認
-    if request.management_fee is not None:
-      available_features.add("management_fee")
-    if request.total_units is not None:
-      available_features.add("total_units")
-    
-    # 地域のモデル情報を取得
-    region_models = config.regions[request.region].models
-    
-    # 最適なモデルを選択（より多くの特徴量を使用するモデルを優先）
-    best_model = None
-    best_score = 0
-    
-    for model_name, model_info in region_models.items():
-      # このモデルが使用する特徴量のうち、利用可能な特徴量の数を計算
-      model_features = set(model_info.features)
-      available_model_features = model_features.intersection(available_features)
-      
-      # 必須特徴量がすべて利用可能か確認
-      required_features = set(model_info.required_features)
-      if not required_features.issubset(available_features):
-        continue
-      
-      # スコアを計算（利用可能な特徴量の数）
-      score = len(available_model_features)
-      
-      if score > best_score:
-        best_score = score
-        best_model = model_name
-    
-    # デフォルトはbaseモデル
-    if best_model is None:
-      best_model = "base"
-    
-    logger.info(f"選択されたモデル: {best_model} (利用可能特徴量: {list(available_features)})")
+    # 任意特徴量の入力有無をビットマスクに変換し、事前計算した対応表を引く
+    mask = _optional_feature_mask(request)
+    dispatch = _model_type_dispatch if config is _config_cache else _build_model_type_dispatch(config)
+    best_model = dispatch.get((request.region, mask), "base")
+
+    logger.debug("選択されたモデル: %s (任意特徴量マスク: %s)", best_model, mask)
     return best_model
 
   def get_model(self, region: str, model_type: str) -> tf.keras.Model:
     """
     指定された地域とモデルタイプのモデルを取得（キャッシュ付き）
 
+    読み込んだモデルの前段にスケーラーの平均・分散を持つ Normalization 層を結合し、
+    未スケールの特徴量をそのまま入力できるモデルとしてキャッシュする。
+
     Args:
       region: 地域名
       model_type: モデルタイプ
     
     Returns:
-      tf.keras.Model: 読み込まれたモデル
+      tf.keras.Model: 標準化層を含むモデル
     
     Raises:
-      FileNotFoundError: モデルファイルが見つからない場合
+      FileNotFoundError: モデルファイルまたはスケーラーファイルが見つからない場合
     """
     cache_key = f"{region}_{model_type}"
-    if cache_key not in _model_cache:
-      model_path = self.get_model_path(region, model_type)
-      if not os.path.exists(model_path):
-        logger.error(f"モデルファイルが見つかりません: {model_path}")
-        raise FileNotFoundError(f"モデルファイルが見つかりません: {model_path}")
-      try:
-        logger.info(f"モデルを読み込み中: {model_path}")
-        model = tf.keras.models.load_model(
-          model_path,
-          compile=False
-        )
-        model.compile(
-          optimizer=tf.keras.optimizers.Adam(learning_rate=0.01),
-          loss='mean_squared_error',
-          metrics=['mae']
-        )
-        _model_cache[cache_key] = model
-        logger.info(f"モデルの読み込みが完了しました: {cache_key}")
-      except Exception as e:
-        logger.error(f"モデルの読み込みに失敗しました: {e}")
-        raise
-    return _model_cache[cache_key]
+    model = _model_cache.get(cache_key)
+    if model is None:
+      # 同じモデルを複数スレッドで重複して読み込まないよう、キーごとにロックして再確認する
+      with _get_load_lock(("model", cache_key)):
+        model = _model_cache.get(cache_key)
+        if model is None:
+          model = self._load_model(region, model_type)
+          _model_cache[cache_key] = model
+          logger.info("モデルの読み込みが完了しました: %s", cache_key)
+    return model
 
-  def get_scaler(self, region: str, model_type: str) -> Any:
+  def _load_model(self, region: str, model_type: str) -> tf.keras.Model:
     """
-    指定された地域とモデルタイプのスケーラーを取得（キャッシュ付き）
-    
+    モデルとスケーラーをファイルから読み込み、標準化層を含むモデルを構築
+
     Args:
       region: 地域名
       model_type: モデルタイプ
-    
+
     Returns:
-      Any: 読み込まれたスケーラー
-    
+      tf.keras.Model: 標準化層を含むモデル
+
     Raises:
-      FileNotFoundError: スケーラーファイルが見つからない場合
+      FileNotFoundError: モデルファイルまたはスケーラーファイルが見つからない場合
+    """
+    model_path = self.get_model_path(region, model_type)
+    if not os.path.exists(model_path):
+      logger.error("モデルファイルが見つかりません: %s", model_path)
+      raise FileNotFoundError(f"モデルファイルが見つかりません: {model_path}")
+    mean, scale = self.load_scaler(region, model_type)
+    try:
+      logger.info("モデルを読み込み中: %s", model_path)
+      # 推論専用のため compile は行わない（オプティマイザ等は不要）
+      model = tf.keras.models.load_model(
+        model_path,
+        compile=False
+      )
+      # 学習は行わないため重みを固定し、勾配関連の管理を不要にする
+      for layer in model.layers:
+        layer.trainable = False
+      model.trainable = False
+      normalization = tf.keras.layers.Normalization(
+        axis=-1,
+        mean=mean,
+        variance=np.square(scale)
+      )
+      wrapped = tf.keras.Sequential([
+        tf.keras.Input(shape=(mean.shape[0],)),
+        normalization,
+        model
+      ])
+      wrapped.trainable = False
+      return wrapped
+    except Exception as e:
+      logger.error("モデルの読み込みに失敗しました: %s", e)
+      raise
+
+  def get_predict_fn(self, region: str, model_type: str) -> Predictor:
+    """
+    指定された地域とモデルタイプの推論関数を取得（キャッシュ付き）
+
+    model.keras と同じディレクトリに model.tflite がある場合は TFLite インタプリタ、
+    saved_model/ がある場合は SavedModel のサービング用シグネチャで推論する。
+    いずれも無い場合、標準化層と全結合層のみのモデルは重みを取り出して NumPy で推論し、
+    それ以外は入力形状を固定した tf.function を一度だけトレースして再利用する。
+    いずれも標準化はモデル内で行うため、未スケールの特徴量をそのまま渡す。
+
+    Args:
+      region: 地域名
+      model_type: モデルタイプ
+
+    Returns:
+      Predictor: 形状 (None, 特徴量数) の float32 を受け取る推論関数
     """
     cache_key = f"{region}_{model_type}"
-    if cache_key not in _scaler_cache:
-      scaler_path = self.get_scaler_path(region, model_type)
-      if not os.path.exists(scaler_path):
-        logger.error(f"スケーラーファイルが見つかりません: {scaler_path}")
-        raise FileNotFoundError(f"スケーラーファイルが見つかりません: {scaler_path}")
-      try:
-        logger.info(f"スケーラーを読み込み中: {scaler_path}")
-        _scaler_cache[cache_key] = joblib.load(scaler_path)
-        logger.info(f"スケーラーの読み込みが完了しました: {cache_key}")
-      except Exception as e:
-        logger.error(f"スケーラーの読み込みに失敗しました: {e}")
-        raise
-    return _scaler_cache[cache_key]
+    predict_fn = _predictor_cache.get(cache_key)
+    if predict_fn is None:
+      with _get_load_lock(("predictor", cache_key)):
+        predict_fn = _predictor_cache.get(cache_key)
+        if predict_fn is None:
+          tflite_path = self.get_tflite_path(region, model_type)
+          saved_model_path = self.get_saved_model_path(region, model_type)
+          if os.path.exists(tflite_path):
+            logger.info("TFLiteモデルを読み込み中: %s", tflite_path)
+            predict_fn = TFLitePredictor(tflite_path)
+          elif os.path.isdir(saved_model_path):
+            logger.info("SavedModelを読み込み中: %s", saved_model_path)
+            predict_fn = SavedModelPredictor(saved_model_path)
+          else:
+            model = self.get_model(region, model_type)
+            stack = extract_dense_stack(model)
+            predict_fn = DensePredictor(stack) if stack is not None else GraphPredictor(model)
+          _predictor_cache[cache_key] = predict_fn
+          logger.info("推論関数の準備が完了しました: %s", cache_key)
+    return predict_fn
 
-  def get_model_and_scaler(self, request: RentPredictionRequest) -> Tuple[tf.keras.Model, Any, ModelInfo]:
+  def get_tflite_path(self, region: str, model_type: str) -> str:
     """
-    入力データに基づいて適切なモデルとスケーラーを取得
-    
+    指定された地域とモデルタイプに基づいてTFLiteモデルのパスを生成
+
+    Args:
+      region: 地域名
+      model_type: モデルタイプ
+
+    Returns:
+      str: TFLiteモデルファイルのパス
+    """
+    return os.path.splitext(self.get_model_path(region, model_type))[0] + ".tflite"
+
+  def get_saved_model_path(self, region: str, model_type: str) -> str:
+    """
+    指定された地域とモデルタイプに基づいてSavedModelのディレクトリパスを生成
+
+    Args:
+      region: 地域名
+      model_type: モデルタイプ
+
+    Returns:
+      str: SavedModelのディレクトリパス
+    """
+    return os.path.join(os.path.dirname(self.get_model_path(region, model_type)), "saved_model")
+
+  def load_scaler(self, region: str, model_type: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    指定された地域とモデルタイプのスケーラーの平均と標準偏差を読み込み
+
+    スケーラーはモデルの Normalization 層に組み込まれるため、結果はキャッシュしない。
+    scaler.npz が無い場合は旧形式の scaler.pkl から読み込む。
+
+    Args:
+      region: 地域名
+      model_type: モデルタイプ
+
+    Returns:
+      Tuple[np.ndarray, np.ndarray]: 平均と標準偏差（float32）
+
+    Raises:
+      FileNotFoundError: スケーラーファイルが見つからない場合
+    """
+    scaler_path = self.get_scaler_path(region, model_type)
+    legacy_path = os.path.splitext(scaler_path)[0] + ".pkl"
+    if not os.path.exists(scaler_path) and not os.path.exists(legacy_path):
+      logger.error("スケーラーファイルが見つかりません: %s", scaler_path)
+      raise FileNotFoundError(f"スケーラーファイルが見つかりません: {scaler_path}")
+    try:
+      if os.path.exists(scaler_path):
+        logger.info("スケーラーを読み込み中: %s", scaler_path)
+        with np.load(scaler_path) as data:
+          mean, scale = data["mean"], data["scale"]
+      else:
+        logger.warning("scaler.npz が無いため旧形式のスケーラーを読み込みます: %s", legacy_path)
+        import joblib
+        return scaler_mean_scale(joblib.load(legacy_path))
+      return np.asarray(mean, dtype=np.float32), np.asarray(scale, dtype=np.float32)
+    except Exception as e:
+      logger.error("スケーラーの読み込みに失敗しました: %s", e)
+      raise
+
+  def get_model_info(self, request: RentPredictionRequest) -> ModelInfo:
+    """
+    入力データに基づいて使用するモデルを選択し、その情報を取得
+
     Args:
       request: 予測リクエスト
-    
+
     Returns:
-      Tuple[tf.keras.Model, Any, ModelInfo]: 
-        - 選択されたモデル
-        - 対応するスケーラー
-        - モデル情報
-    
+      ModelInfo: 選択されたモデルの情報
+
     Raises:
       ValueError: 指定された地域またはモデルタイプが見つからない場合
     """
+    # 同じ地域・任意特徴量の組み合わせでは結果が変わらないため、作成済みの情報を使い回す
+    cache_key = (request.region, _optional_feature_mask(request))
+    model_info = _model_info_cache.get(cache_key)
+    if model_info is not None:
+      return model_info
+
     config = self.load_config()
     
     # 地域の存在確認
     if request.region not in config.regions:
       available_regions = list(config.regions.keys())
-      logger.error(f"指定された地域が見つかりません: {request.region}")
+      logger.error("指定された地域が見つかりません: %s", request.region)
       raise ValueError(f"指定された地域が見つかりません: {request.region}. 利用可能な地域: {available_regions}")
     
     # モデルタイプの決定
     model_type = self.determine_model_type(request, config)
-    logger.info(f"モデルタイプを決定しました: {model_type}")
+    logger.debug("モデルタイプを決定しました: %s", model_type)
     
     # モデルタイプの存在確認
     if model_type not in config.regions[request.region].models:
       available_models = list(config.regions[request.region].models.keys())
-      logger.error(f"指定されたモデルタイプが見つかりません: {model_type}")
+      logger.error("指定されたモデルタイプが見つかりません: %s", model_type)
       raise ValueError(f"指定されたモデルタイプが見つかりません: {model_type}. 利用可能なモデル: {available_models}")
     
-    # モデルとスケーラーの取得
-    model = self.get_model(request.region, model_type)
-    scaler = self.get_scaler(request.region, model_type)
     model_config = config.regions[request.region].models[model_type]
     
     # ModelInfoクラスを使って地域情報を含めた情報を作成
@@ -247,16 +582,110 @@ class ModelLoader:
       features=model_config.features,
       description=model_config.description
     )
+    _model_info_cache[cache_key] = model_info
+    return model_info
+
+  def get_model_and_scaler(self, request: RentPredictionRequest) -> Tuple[tf.keras.Model, None, ModelInfo]:
+    """
+    入力データに基づいて適切なモデルとスケーラーを取得
+    
+    Args:
+      request: 予測リクエスト
     
-    logger.info(f"モデルとスケーラーの取得が完了しました: {request.region}_{model_type}")
+    Returns:
+      Tuple[tf.keras.Model, None, ModelInfo]: 
+        - 選択されたモデル（標準化層を含む）
+        - スケーラー（モデルに組み込まれているため常に None）
+        - モデル情報
     
-    return model, scaler, model_info
+    Raises:
+      ValueError: 指定された地域またはモデルタイプが見つからない場合
+    """
+    model_info = self.get_model_info(request)
+    model = self.get_model(model_info.region, model_info.model_type)
+    logger.debug("モデルとスケーラーの取得が完了しました: %s_%s", model_info.region, model_info.model_type)
+    return model, None, model_info
+
+  def get_model_keys(self) -> List[Tuple[str, str]]:
+    """
+    設定ファイルに記載された全ての (地域, モデルタイプ) を取得
+
+    Returns:
+      List[Tuple[str, str]]: (地域, モデルタイプ) のリスト
+    """
+    config = self.load_config()
+    return [
+      (region, model_type)
+      for region, region_config in config.regions.items()
+      for model_type in region_config.models
+    ]
+
+  def warmup_model(self, region: str, model_type: str) -> None:
+    """
+    指定されたモデルを読み込み、ダミー入力で一度推論して推論関数を準備する
+
+    読み込みに失敗した場合はログを出力し、例外は送出しない。
+
+    Args:
+      region: 地域名
+      model_type: モデルタイプ
+    """
+    try:
+      predict_fn = self.get_predict_fn(region, model_type)
+      predict_fn(np.zeros((1, predict_fn.n_features), dtype=np.float32))
+    except Exception as e:
+      logger.warning("モデルのウォームアップに失敗しました: %s_%s: %s", region, model_type, e)
+
+  def build_stacked_predictors(self) -> None:
+    """
+    モデルタイプごとに、同じ構造を持つ地域別モデルをまとめた推論関数を構築
+
+    TFLite・SavedModel で推論するモデルや、全結合層以外を含むモデルはまとめない。
+    """
+    try:
+      model_keys = self.get_model_keys()
+    except Exception as e:
+      logger.warning("設定ファイルを読み込めないため、地域別モデルをまとめません: %s", e)
+      return
+    regions_by_type: Dict[str, List[str]] = {}
+    for region, model_type in model_keys:
+      regions_by_type.setdefault(model_type, []).append(region)
+    for model_type, regions in regions_by_type.items():
+      try:
+        if any(
+          os.path.exists(self.get_tflite_path(region, model_type))
+          or os.path.isdir(self.get_saved_model_path(region, model_type))
+          for region in regions
+        ):
+          continue
+        models = {region: self.get_model(region, model_type) for region in regions}
+        stacked = build_stacked_predictor(models)
+        if stacked is not None:
+          _stacked_cache[model_type] = stacked
+          logger.info("地域別モデルをまとめました: %s (%s地域)", model_type, len(regions))
+      except Exception as e:
+        logger.warning("地域別モデルをまとめられませんでした: %s: %s", model_type, e)
+
+  def get_stacked_predictor(self, model_type: str) -> Optional[StackedRegionPredictor]:
+    """
+    地域別モデルをまとめた推論関数を取得
+
+    Args:
+      model_type: モデルタイプ
+
+    Returns:
+      Optional[StackedRegionPredictor]: まとめた推論関数（構築されていない場合は None）
+    """
+    return _stacked_cache.get(model_type)
 
 
 # グローバル関数（後方互換性のため）
-_model_loader = ModelLoader()
+@functools.cache
+def _get_loader() -> ModelLoader:
+  """共有の ModelLoader を取得（初回使用時に生成）"""
+  return ModelLoader()
 
-def get_model_and_scaler(request: RentPredictionRequest) -> Tuple[tf.keras.Model, Any, ModelInfo]:
+def get_model_and_scaler(request: RentPredictionRequest) -> Tuple[tf.keras.Model, None, ModelInfo]:
   """
   後方互換性のためのグローバル関数
   
@@ -264,6 +693,51 @@ def get_model_and_scaler(request: RentPredictionRequest) -> Tuple[tf.keras.Model
     request: 予測リクエスト
   
   Returns:
-    Tuple[tf.keras.Model, Any, ModelInfo]: モデル、スケーラー、モデル情報
+    Tuple[tf.keras.Model, None, ModelInfo]: モデル、スケーラー、モデル情報
+  """
+  return _get_loader().get_model_and_scaler(request)
+
+def get_model_info(request: RentPredictionRequest) -> ModelInfo:
+  """
+  使用するモデルの情報を取得するグローバル関数
+
+  Args:
+    request: 予測リクエスト
+
+  Returns:
+    ModelInfo: 選択されたモデルの情報
   """
-  return _model_loader.get_model_and_scaler(request)
+  return _get_loader().get_model_info(request)
+
+def get_predict_fn(region: str, model_type: str) -> Predictor:
+  """
+  推論関数を取得するグローバル関数
+
+  Args:
+    region: 地域名
+    model_type: モデルタイプ
+
+  Returns:
+    Predictor: 推論関数
+  """
+  return _get_loader().get_predict_fn(region, model_type)
+
+def get_app_config() -> AppConfig:
+  """アプリケーション設定を取得するグローバル関数"""
+  return _get_loader().load_config()
+
+def get_model_keys() -> List[Tuple[str, str]]:
+  """設定ファイルに記載された全ての (地域, モデルタイプ) を取得するグローバル関数"""
+  return _get_loader().get_model_keys()
+
+def warmup_model(region: str, model_type: str) -> None:
+  """指定されたモデルのウォームアップを行うグローバル関数"""
+  _get_loader().warmup_model(region, model_type)
+
+def build_stacked_predictors() -> None:
+  """地域別モデルをまとめた推論関数を構築するグローバル関数"""
+  _get_loader().build_stacked_predictors()
+
+def get_stacked_predictor(model_type: str) -> Optional[StackedRegionPredictor]:
+  """地域別モデルをまとめた推論関数を取得するグローバル関数"""
+  return _get_loader().get_stacked_predictor(model_type)
@@ -0,0 +1,121 @@
+import threading
+from abc import ABC, abstractmethod
+import numpy as np
+import tensorflow as tf
+from app.core.stacked_model import ACTIVATIONS, DenseStack, fold_normalization
+
+class Predictor(ABC):
+  """
+  推論関数の共通インターフェース
+
+  形状 (バッチ数, n_features) の float32 配列（未スケールの特徴量）を受け取り、
+  形状 (バッチ数, 1) の予測結果を NumPy 配列で返す。
+  """
+  n_features: int
+
+  @abstractmethod
+  def __call__(self, x: np.ndarray) -> np.ndarray:
+    """推論を実行"""
+
+class GraphPredictor(Predictor):
+  """
+  入力形状を固定してトレースした tf.function による推論
+
+  バッチ推論ではバッチ数が 1〜最大バッチ数の間で変わるため、入力形状ごとに再コンパイルが
+  発生する XLA（jit_compile）は使わず、バッチ数を None にした1つのグラフを使い回す。
+  """
+
+  def __init__(self, model: tf.keras.Model):
+    self.n_features = int(model.input_shape[-1])
+    predict = tf.function(
+      lambda x: model(x, training=False),
+      input_signature=[tf.TensorSpec([None, self.n_features], tf.float32)]
+    )
+    self._concrete_fn = predict.get_concrete_function()
+
+  def __call__(self, x: np.ndarray) -> np.ndarray:
+    return self._concrete_fn(x).numpy()
+
+class DensePredictor(Predictor):
+  """
+  標準化層＋全結合層のみで構成されたモデルを NumPy の行列積で推論
+
+  小さなモデルを数件ずつ推論する場合、TensorFlow のグラフ実行の呼び出しコストが
+  計算そのものより大きいため、重みを取り出して直接計算する。
+  標準化は最初の全結合層の重みに畳み込み、入力を一度だけ走査する。
+  """
+
+  def __init__(self, stack: DenseStack):
+    self.n_features = int(stack.mean.shape[0])
+    self._layers = [
+      (layer.kernel, layer.bias, ACTIVATIONS[layer.activation])
+      for layer in fold_normalization(stack)
+    ]
+
+  def __call__(self, x: np.ndarray) -> np.ndarray:
+    h = np.asarray(x, dtype=np.float32)
+    for kernel, bias, activation in self._layers:
+      h = h @ kernel + bias
+      if activation is not None:
+        h = activation(h)
+    return h
+
+class TFLitePredictor(Predictor):
+  """
+  TFLite インタプリタによる推論
+
+  インタプリタはスレッドセーフではないため、スレッドごとに生成して使い回す。
+  """
+
+  def __init__(self, model_path: str):
+    self.model_path = model_path
+    self._local = threading.local()
+    interpreter = self._get_interpreter()
+    self.n_features = int(interpreter.get_input_details()[0]["shape"][-1])
+
+  def _get_interpreter(self) -> tf.lite.Interpreter:
+    """現在のスレッド用のインタプリタを取得"""
+    local = self._local
+    interpreter = getattr(local, "interpreter", None)
+    if interpreter is None:
+      interpreter = tf.lite.Interpreter(model_path=self.model_path, num_threads=1)
+      interpreter.allocate_tensors()
+      input_details = interpreter.get_input_details()[0]
+      local.interpreter = interpreter
+      local.input_index = input_details["index"]
+      local.output_index = interpreter.get_output_details()[0]["index"]
+      local.batch_size = int(input_details["shape"][0])
+    return interpreter
+
+  def __call__(self, x: np.ndarray) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float32)
+    interpreter = self._get_interpreter()
+    local = self._local
+    # バッチ数が変わった場合のみ入力テンソルを作り直す
+    if x.shape[0] != local.batch_size:
+      interpreter.resize_tensor_input(local.input_index, x.shape)
+      interpreter.allocate_tensors()
+      local.batch_size = x.shape[0]
+    interpreter.set_tensor(local.input_index, x)
+    interpreter.invoke()
+    return interpreter.get_tensor(local.output_index)
+
+class SavedModelPredictor(Predictor):
+  """
+  SavedModel のサービング用シグネチャによる推論
+
+  Keras の学習用の構造を復元せず、トレース済みの推論グラフのみを読み込む。
+  """
+
+  def __init__(self, saved_model_path: str):
+    self.saved_model_path = saved_model_path
+    self._loaded = tf.saved_model.load(saved_model_path)
+    self._signature = self._loaded.signatures["serving_default"]
+    input_specs = self._signature.structured_input_signature[1]
+    self._input_name = next(iter(input_specs))
+    self._output_name = next(iter(self._signature.structured_outputs))
+    self.n_features = int(input_specs[self._input_name].shape[-1])
+
+  def __call__(self, x: np.ndarray) -> np.ndarray:
+    outputs = self._signature(**{self._input_name: tf.constant(x, dtype=tf.float32)})
+    return outputs[self._output_name].numpy()
@@ -0,0 +1,200 @@
+from typing import Dict, List, NamedTuple, Optional
+import numpy as np
+import tensorflow as tf
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Keras の Normalization 層が標準偏差の下限に使う値
+_NORMALIZATION_EPSILON = 1e-7
+
+def _sigmoid(h: np.ndarray) -> np.ndarray:
+  return 1.0 / (1.0 + np.exp(-h))
+
+# 対応する活性化関数の NumPy 実装（linear は何もしない）
+ACTIVATIONS = {
+  "linear": None,
+  "relu": lambda h: np.maximum(h, 0.0),
+  "sigmoid": _sigmoid,
+  "tanh": np.tanh,
+}
+
+class DenseLayerWeights(NamedTuple):
+  """全結合層の重み"""
+  kernel: np.ndarray
+  bias: np.ndarray
+  activation: str
+
+class DenseStack(NamedTuple):
+  """標準化層と全結合層のみで構成されたモデルの重み"""
+  mean: np.ndarray
+  inv_std: np.ndarray
+  layers: List[DenseLayerWeights]
+
+def _flatten_layers(model: tf.keras.Model) -> Optional[list]:
+  """
+  入れ子になったモデルを展開し、層を順番に並べる
+
+  層が一列に繋がっていることが保証される Sequential のみを対象とする。
+  Functional API のモデルは分岐や複数出力を持ち得るため、model.layers の順に
+  計算すると結果が変わる可能性があり、None を返す。
+  """
+  if not isinstance(model, tf.keras.Sequential):
+    return None
+  layers = []
+  for layer in model.layers:
+    if isinstance(layer, tf.keras.Model):
+      nested = _flatten_layers(layer)
+      if nested is None:
+        return None
+      layers.extend(nested)
+    else:
+      layers.append(layer)
+  return layers
+
+def extract_dense_stack(model: tf.keras.Model) -> Optional[DenseStack]:
+  """
+  標準化層＋全結合層のみで構成されたモデルから重みを取り出す
+
+  Args:
+    model: 標準化層を含むモデル
+
+  Returns:
+    Optional[DenseStack]: 取り出した重み（Sequential 以外のモデルや対応していない層を含む場合は None）
+  """
+  layers = _flatten_layers(model)
+  if layers is None:
+    return None
+  mean = inv_std = None
+  dense_layers = []
+  for layer in layers:
+    if isinstance(layer, (tf.keras.layers.InputLayer, tf.keras.layers.Dropout)):
+      continue
+    if isinstance(layer, tf.keras.layers.Normalization) and mean is None and not dense_layers:
+      mean = np.asarray(layer.mean, dtype=np.float32).reshape(-1)
+      std = np.sqrt(np.asarray(layer.variance, dtype=np.float32).reshape(-1))
+      inv_std = 1.0 / np.maximum(std, _NORMALIZATION_EPSILON)
+      continue
+    if isinstance(layer, tf.keras.layers.Dense):
+      activation = layer.get_config().get("activation")
+      if activation not in ACTIVATIONS:
+        return None
+      weights = layer.get_weights()
+      kernel = np.asarray(weights[0], dtype=np.float32)
+      bias = np.asarray(weights[1], dtype=np.float32) if layer.use_bias else np.zeros(kernel.shape[1], dtype=np.float32)
+      dense_layers.append(DenseLayerWeights(kernel, bias, activation))
+      continue
+    return None
+  if mean is None or not dense_layers:
+    return None
+  return DenseStack(mean, inv_std.astype(np.float32), dense_layers)
+
+def fold_normalization(stack: DenseStack) -> List[DenseLayerWeights]:
+  """
+  標準化の平均・標準偏差を最初の全結合層の重みに畳み込む
+
+  ((x - mean) * inv_std) @ W + b = x @ (inv_std[:, None] * W) + (b - (mean * inv_std) @ W)
+  のため、推論時の標準化の計算と一時配列を省略できる。
+
+  Args:
+    stack: 取り出した重み
+
+  Returns:
+    List[DenseLayerWeights]: 未スケールの特徴量をそのまま入力できる全結合層の重み
+  """
+  first = stack.layers[0]
+  # 丸め誤差を抑えるため float64 で計算してから float32 に戻す
+  first_kernel = first.kernel.astype(np.float64)
+  inv_std = stack.inv_std.astype(np.float64)
+  kernel = (inv_std[:, None] * first_kernel).astype(np.float32)
+  bias = (first.bias - (stack.mean * inv_std) @ first_kernel).astype(np.float32)
+  return [DenseLayerWeights(kernel, bias, first.activation)] + list(stack.layers[1:])
+
+def _same_architecture(stacks: List[DenseStack]) -> bool:
+  """全てのモデルが同じ形状・活性化関数を持つか確認"""
+  first = stacks[0]
+  for stack in stacks[1:]:
+    if stack.mean.shape != first.mean.shape or len(stack.layers) != len(first.layers):
+      return False
+    for layer, first_layer in zip(stack.layers, first.layers):
+      if layer.kernel.shape != first_layer.kernel.shape or layer.activation != first_layer.activation:
+        return False
+  return True
+
+class StackedRegionPredictor:
+  """
+  同じ構造を持つ地域別モデルの重みを積み重ね、NumPy の行列積でまとめて推論する
+
+  入力の各行に対応する地域の重みをインデックスで選択するため、
+  異なる地域のリクエストも1回の推論にまとめられる。
+  小さなモデルでは TensorFlow のグラフ実行の呼び出しコストが計算そのものより大きいため、
+  DensePredictor と同様に tf.function を使わず直接計算する。
+  """
+
+  def __init__(self, stacks: Dict[str, DenseStack]):
+    self.regions = list(stacks)
+    self.region_index = {region: i for i, region in enumerate(self.regions)}
+    stack_list = [stacks[region] for region in self.regions]
+    self.n_features = int(stack_list[0].mean.shape[0])
+    # 標準化は最初の全結合層に畳み込む
+    folded = [fold_normalization(stack) for stack in stack_list]
+    # 各層の重みを形状 (地域数, 入力数, 出力数)・(地域数, 出力数) に積み重ねる
+    self._layers = [
+      (
+        np.stack([region_layers[i].kernel for region_layers in folded]),
+        np.stack([region_layers[i].bias for region_layers in folded]),
+        ACTIVATIONS[folded[0][i].activation]
+      )
+      for i in range(len(folded[0]))
+    ]
+
+  def __call__(self, x: np.ndarray, region_ids: np.ndarray) -> np.ndarray:
+    """
+    地域ごとの重みで推論
+
+    Args:
+      x: 形状 (バッチ数, n_features) の未スケールの特徴量
+      region_ids: 各行の地域番号（region_index の値）
+
+    Returns:
+      np.ndarray: 形状 (バッチ数, 出力数) の予測結果
+    """
+    h = np.asarray(x, dtype=np.float32)
+    region_ids = np.asarray(region_ids, dtype=np.intp)
+    first = region_ids[0]
+    if (region_ids == first).all():
+      # 全ての行が同じ地域の場合は重みを複製せず、通常の行列積で計算する
+      for kernel, bias, activation in self._layers:
+        h = h @ kernel[first] + bias[first]
+        if activation is not None:
+          h = activation(h)
+      return h
+    for kernel, bias, activation in self._layers:
+      h = np.einsum("bn,bnm->bm", h, kernel[region_ids]) + bias[region_ids]
+      if activation is not None:
+        h = activation(h)
+    return h
+
+def build_stacked_predictor(models: Dict[str, tf.keras.Model]) -> Optional[StackedRegionPredictor]:
+  """
+  地域別モデルをまとめた推論関数を構築
+
+  Args:
+    models: 地域名からモデル（標準化層を含む）への対応
+
+  Returns:
+    Optional[StackedRegionPredictor]: まとめた推論関数（構造が異なる・対応していない層を含む場合は None）
+  """
+  if len(models) < 2:
+    return None
+  stacks = {}
+  for region, model in models.items():
+    stack = extract_dense_stack(model)
+    if stack is None:
+      logger.info("全結合層以外を含むため、地域別モデルをまとめません: %s", region)
+      return None
+    stacks[region] = stack
+  if not _same_architecture(list(stacks.values())):
+    logger.info("地域ごとにモデルの構造が異なるため、まとめません")
+    return None
+  return StackedRegionPredictor(stacks)
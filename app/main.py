@@ -1,21 +1,67 @@
 import os
-import json
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+
+# TensorFlow の読み込み前に推論スレッド数と oneDNN の設定を行う
+# （バッチサイズ1の小さなモデルではスレッド間の同期コストが計算時間を上回るため1スレッドにする）
+os.environ.setdefault("TF_NUM_INTRAOP_THREADS", "1")
+os.environ.setdefault("TF_NUM_INTEROP_THREADS", "1")
+os.environ.setdefault("TF_ENABLE_ONEDNN_OPTS", "1")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional, Tuple
+import orjson
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 from app.models.schemas import RentPredictionRequest, RentPredictionResponse
 from app.models.config import AppConfig
-from app.services.prediction import predict_rent
+from app.services.prediction import predict_rent_async, shutdown_prediction_service
+from app.core.model_loader import get_app_config, get_model_keys, warmup_model, build_stacked_predictors
 from app.core.logging_config import setup_logging, get_logger
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 # ログ設定の初期化
 setup_logging()
 logger = get_logger(__name__)
 
+async def _warmup_models() -> None:
+  """全モデルを並列に読み込み、推論関数を準備する（イベントループはブロックしない）"""
+  try:
+    model_keys = await asyncio.to_thread(get_model_keys)
+  except Exception as e:
+    logger.warning("設定ファイルを読み込めないため、ウォームアップをスキップします: %s", e)
+    return
+  # モデルの読み込みはファイルI/Oやデシリアライズ中にGILを解放するため、スレッドで並列に実行する
+  await asyncio.gather(*(
+    asyncio.to_thread(warmup_model, region, model_type)
+    for region, model_type in model_keys
+  ))
+  await asyncio.to_thread(build_stacked_predictors)
+  logger.info("モデルのウォームアップが完了しました")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+  """アプリケーションの起動時・終了時の処理"""
+  # 初回リクエストの遅延を避けるため、モデルとモデル情報を事前に読み込む
+  await _warmup_models()
+  try:
+    await asyncio.to_thread(_load_models_payload)
+  except Exception as e:
+    logger.warning("モデル情報の事前読み込みに失敗しました: %s", e)
+  logger.info("家賃相場予測APIを起動しました")
+  yield
+  await shutdown_prediction_service()
+  logger.info("家賃相場予測APIを終了しました")
+
 app = FastAPI(
   title="家賃相場予測API",
   description="物件情報から家賃相場を予測するAPI",
-  version="1.0.0"
+  version="1.0.0",
+  default_response_class=ORJSONResponse,
+  lifespan=lifespan
 )
 
 # CORS設定
@@ -36,15 +82,34 @@ app.add_middleware(
   allow_headers=["*"],
 )
 
-@app.on_event("startup")
-async def startup_event():
-  """アプリケーション起動時の処理"""
-  logger.info("家賃相場予測APIを起動しました")
+# /api/v1/models のレスポンス本文とETag（シリアライズ元の設定オブジェクトと組で保持）
+_models_payload: Optional[Tuple[AppConfig, bytes, str]] = None
 
-@app.on_event("shutdown")
-async def shutdown_event():
-  """アプリケーション終了時の処理"""
-  logger.info("家賃相場予測APIを終了しました")
+def _load_models_payload() -> Tuple[bytes, str]:
+  """
+  /api/v1/models のレスポンス本文とETagを取得（キャッシュ付き）
+
+  予測と同じ設定オブジェクト（ModelLoader が読み込んだもの）をシリアライズするため、
+  一覧に表示される地域・モデルは必ず予測にも使用できる。
+
+  Returns:
+    Tuple[bytes, str]: レスポンス本文とETag
+
+  Raises:
+    FileNotFoundError: 設定ファイルが見つからない場合
+    ValidationError: 設定ファイルの形式が正しくない場合
+  """
+  global _models_payload
+  config = get_app_config()
+  payload = _models_payload
+  if payload is None or payload[0] is not config:
+    body = orjson.dumps(config.model_dump(mode='json'))
+    etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+    payload = _models_payload = (config, body, etag)
+  return payload[1], payload[2]
+
+# /health のレスポンス本文（内容は固定のため、起動時に一度だけシリアライズする）
+_HEALTH_BYTES = orjson.dumps({"status": "healthy", "service": "rent-prediction-api"})
 
 @app.get("/health")
 async def health_check():
@@ -52,47 +117,52 @@ async def health_check():
   ヘルスチェックエンドポイント
   
   Returns:
-    dict: アプリケーションの状態
+    Response: アプリケーションの状態
   """
-  logger.debug("ヘルスチェックが実行されました")
-  return {"status": "healthy", "service": "rent-prediction-api"}
+  return Response(content=_HEALTH_BYTES, media_type="application/json")
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+  """If-None-Match ヘッダー（複数指定・"*"・弱いETagを含む）がETagと一致するか判定"""
+  if not if_none_match:
+    return False
+  for candidate in if_none_match.split(","):
+    candidate = candidate.strip()
+    if candidate == "*" or candidate.removeprefix("W/") == etag:
+      return True
+  return False
 
 @app.get("/api/v1/models")
-async def get_available_models():
+async def get_available_models(request: Request):
   """
   利用可能なモデル情報を取得するエンドポイント
+
+  予測と同じ設定をシリアライズ済みのJSONとして返す。
+  If-None-Match がETagと一致する場合は 304 を返す。
   
   Returns:
-    dict: 利用可能な地域とモデルの情報
+    Response: 利用可能な地域とモデルの情報
     
   Raises:
     HTTPException: 設定ファイルの読み込みに失敗した場合
   """
+  logger.debug("モデル情報の取得リクエストを受けました")
   try:
-    logger.info("モデル情報の取得リクエストを受けました")
-    
-    config_path = os.path.join(os.path.dirname(__file__), "..", "saved_models", "config.json")
-    
-    if not os.path.exists(config_path):
-      logger.error(f"設定ファイルが見つかりません: {config_path}")
-      raise HTTPException(status_code=500, detail="設定ファイルが見つかりません")
-    
-    with open(config_path, 'r', encoding='utf-8') as f:
-      config_data = json.load(f)
-    
-    # 設定の妥当性を検証
-    config = AppConfig(**config_data)
-    
-    logger.info("モデル情報を正常に取得しました")
-    return config.dict()
-    
-  except json.JSONDecodeError as e:
-    logger.error(f"設定ファイルの形式が正しくありません: {e}")
+    body, etag = await run_in_threadpool(_load_models_payload)
+  except FileNotFoundError as e:
+    logger.error(str(e))
+    raise HTTPException(status_code=500, detail="設定ファイルが見つかりません")
+  except ValidationError as e:
+    logger.error("設定ファイルの形式が正しくありません: %s", e)
     raise HTTPException(status_code=500, detail="設定ファイルの形式が正しくありません")
   except Exception as e:
-    logger.error(f"モデル情報の取得に失敗しました: {e}")
+    logger.error("モデル情報の取得に失敗しました: %s", e)
     raise HTTPException(status_code=500, detail="モデル情報の取得に失敗しました")
 
+  if _etag_matches(request.headers.get("if-none-match"), etag):
+    return Response(status_code=304, headers={"ETag": etag})
+  logger.debug("モデル情報を正常に取得しました")
+  return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 @app.post("/api/v1/predict", response_model=RentPredictionResponse)
 async def predict_rent_endpoint(request: RentPredictionRequest):
   """
@@ -124,26 +194,27 @@ async def predict_rent_endpoint(request: RentPredictionRequest):
     HTTPException: 予測処理中にエラーが発生した場合
   """
   try:
-    logger.info(f"予測リクエストを受けました: region={request.region}")
-    result = predict_rent(request)
-    logger.info(f"予測が正常に完了しました: region={request.region}")
-    return result
+    logger.debug("予測リクエストを受けました: region=%s", request.region)
+    result = await predict_rent_async(request)
+    logger.debug("予測が正常に完了しました: region=%s", request.region)
+    # 結果はサービス内で検証済みのため、response_model による再検証を行わず直接シリアライズする
+    return ORJSONResponse(result.model_dump())
     
   except ValueError as e:
-    logger.error(f"バリデーションエラー: {e}")
+    logger.error("バリデーションエラー: %s", e)
     raise HTTPException(status_code=400, detail=str(e))
   except FileNotFoundError as e:
-    logger.error(f"モデルファイルが見つかりません: {e}")
+    logger.error("モデルファイルが見つかりません: %s", e)
     raise HTTPException(status_code=500, detail="モデルファイルが見つかりません")
   except Exception as e:
-    logger.error(f"予測処理中にエラーが発生しました: {e}", exc_info=True)
+    logger.error("予測処理中にエラーが発生しました: %s", e, exc_info=True)
     raise HTTPException(status_code=500, detail="予測処理中にエラーが発生しました")
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
   """グローバル例外ハンドラー"""
-  logger.error(f"未処理の例外が発生しました: {exc}", exc_info=True)
-  return JSONResponse(
+  logger.error("未処理の例外が発生しました: %s", exc, exc_info=True)
+  return ORJSONResponse(
     status_code=500,
     content={"detail": "内部サーバーエラーが発生しました"}
   )
@@ -1,7 +1,10 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional
 
 class RentPredictionRequest(BaseModel):
+  # 検証後に変更されないため不変にする
+  model_config = ConfigDict(frozen=True)
+
   # 必須パラメータ
   area: float = Field(..., description="面積（㎡）", gt=0)
   age: int = Field(..., description="築年数", ge=0)
@@ -17,6 +20,9 @@ class RentPredictionRequest(BaseModel):
   region: str = Field(..., description="地域名（suginami, musashino, kitaku, nakanoku, nerimaku）")
 
 class RentPredictionResponse(BaseModel):
+  # サービス内でのみ生成されるため、未定義のフィールドは受け付けない
+  model_config = ConfigDict(frozen=True, extra="forbid")
+
   # 入力された条件
   input_conditions: RentPredictionRequest = Field(..., description="入力された条件")
 
@@ -0,0 +1,91 @@
+import asyncio
+import os
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from app.core.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 1回の推論でまとめる最大リクエスト数（環境変数 PREDICTION_MAX_BATCH_SIZE で変更可能）
+MAX_BATCH_SIZE = int(os.environ.get("PREDICTION_MAX_BATCH_SIZE", "32"))
+
+# 最初のリクエストを受けてから後続のリクエストを待つ時間（秒）
+# （環境変数 PREDICTION_BATCH_WINDOW_MS で変更可能。既定の0では待たずにキューに溜まっている分だけまとめる）
+BATCH_WINDOW = float(os.environ.get("PREDICTION_BATCH_WINDOW_MS", "0")) / 1000.0
+
+def _run_batch(predict_fn: Callable[..., Any], batch: np.ndarray, region_ids: Optional[np.ndarray]) -> np.ndarray:
+  """推論関数をバッチ入力で実行し、結果をNumPy配列に変換"""
+  if region_ids is None:
+    return np.asarray(predict_fn(batch))
+  return np.asarray(predict_fn(batch, region_ids))
+
+class PredictionBatcher:
+  """同一モデルへの推論リクエストをまとめて1回の推論で処理するマイクロバッチャー"""
+  def __init__(self, max_batch_size: int = MAX_BATCH_SIZE, batch_window: float = BATCH_WINDOW):
+    self.max_batch_size = max_batch_size
+    self.batch_window = batch_window
+    self._queues: Dict[Hashable, asyncio.Queue] = {}
+    self._workers: Dict[Hashable, asyncio.Task] = {}
+  async def predict(self, key: Hashable, predict_fn: Callable[..., Any], features: np.ndarray, region_id: Optional[int] = None) -> np.ndarray:
+    """
+    1件分の特徴量をキューに追加し、バッチ推論の結果を待つ
+    Args:
+      key: バッチをまとめる単位（地域とモデルタイプ、または地域別モデルをまとめた場合はモデルタイプ）
+      predict_fn: 形状 (バッチ数, 特徴量数) の入力を受け取る推論関数
+      features: 1件分の特徴量（形状 (特徴量数,)）。呼び出し側で再利用しない配列を渡すこと
+      region_id: 地域別モデルをまとめた推論関数を使う場合の地域番号
+    Returns:
+      np.ndarray: 1件分の推論結果
+    """
+    queue = self._queues.get(key)
+    if queue is None:
+      queue = self._queues[key] = asyncio.Queue()
+    worker = self._workers.get(key)
+    if worker is None or worker.done():
+      # 初回、またはワーカーが予期せず停止していた場合は（キューに残っている分も含めて）新しいワーカーで処理する
+      if worker is not None and not worker.cancelled() and worker.exception() is not None:
+        logger.error("バッチ推論のワーカーが停止していたため再起動します: %s", worker.exception())
+      self._workers[key] = asyncio.create_task(self._worker(queue))
+    future = asyncio.get_running_loop().create_future()
+    await queue.put((predict_fn, features, region_id, future))
+    return await future
+  async def _worker(self, queue: asyncio.Queue) -> None:
+    """キューに溜まったリクエストをまとめて推論し、結果を各リクエストに返す"""
+    loop = asyncio.get_running_loop()
+    while True:
+      items: List[Tuple[Callable[..., Any], np.ndarray, Optional[int], asyncio.Future]] = [await queue.get()]
+      if self.batch_window > 0 and queue.qsize() < self.max_batch_size - 1:
+        # 後続のリクエストが届くまで少し待ってからまとめる
+        await asyncio.sleep(self.batch_window)
+      while len(items) < self.max_batch_size:
+        try:
+          items.append(queue.get_nowait())
+        except asyncio.QueueEmpty:
+          break
+      try:
+        predict_fn = items[0][0]
+        batch = np.stack([features for _, features, _, _ in items])
+        region_ids = None
+        if items[0][2] is not None:
+          region_ids = np.array([region_id for _, _, region_id, _ in items], dtype=np.int32)
+        # 推論はスレッドで実行し、イベントループをブロックしない
+        outputs = await loop.run_in_executor(None, _run_batch, predict_fn, batch, region_ids)
+        if len(outputs) != len(items):
+          raise ValueError(f"推論結果の件数が入力と一致しません: {len(outputs)} != {len(items)}")
+      except Exception as e:
+        logger.error("バッチ推論に失敗しました: %s", e)
+        for _, _, _, future in items:
+          if not future.done():
+            future.set_exception(e)
+        continue
+      for (_, _, _, future), output in zip(items, outputs):
+        if not future.done():
+          future.set_result(output)
+  async def close(self) -> None:
+    """全てのワーカーを停止"""
+    workers = list(self._workers.values())
+    for worker in workers:
+      worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    self._workers.clear()
+    self._queues.clear()
@@ -1,10 +1,13 @@
 from app.models.schemas import RentPredictionRequest, RentPredictionResponse
 from app.models.config import ModelInfo
-from app.core.model_loader import get_model_and_scaler
-from app.core.feature_mapper import FeatureMapper
+from app.core.model_loader import get_model_info, get_predict_fn, get_stacked_predictor
+from app.core.predictors import Predictor
+from app.core.feature_mapper import Extractor, FeatureMapper
 from app.core.logging_config import get_logger
+from app.services.batching import PredictionBatcher
+from starlette.concurrency import run_in_threadpool
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 
 logger = get_logger(__name__)
 
@@ -12,6 +15,9 @@ class RentPredictionService:
   """家賃予測サービス"""
   def __init__(self):
     self.feature_mapper = FeatureMapper()
+    self.batcher = PredictionBatcher()
+    # (地域, モデルタイプ) ごとの検証済み抽出関数
+    self._extractors: Dict[Tuple[str, str], Tuple[Extractor, ...]] = {}
   def predict_rent(self, request: RentPredictionRequest) -> RentPredictionResponse:
     """
     家賃相場を予測する
@@ -24,86 +30,148 @@ class RentPredictionService:
       Exception: 予測処理中にエラーが発生した場合
     """
     try:
-      logger.info(f"予測開始: region={request.region}, area={request.area}, age={request.age}")
-      model, scaler, model_info = get_model_and_scaler(request)
-      input_data = self._prepare_input_data(request, model_info.features, scaler)
-      logger.info(f"予測実行中: 特徴量数={len(model_info.features)}")
-      input_data_scaled = scaler.transform(input_data)
-      predicted_rent = float(model.predict(input_data_scaled)[0][0])
-      reasonable_range = self._calculate_reasonable_range(predicted_rent)
-      price_evaluation = self._evaluate_price(request.rent, predicted_rent, reasonable_range)
-      logger.info(f"予測完了: 予測家賃={predicted_rent:.2f}, 評価={price_evaluation}")
-      return RentPredictionResponse(
-        input_conditions=request,
-        model_info=model_info.dict(),
-        predicted_rent=predicted_rent,
-        reasonable_range=reasonable_range,
-        price_evaluation=price_evaluation
-      )
+      predict_fn, input_data, model_info = self._prepare_prediction(request)
+      predicted_rent = float(predict_fn(input_data)[0][0])
+      return self._build_response(request, model_info, predicted_rent)
     except Exception as e:
-      logger.error(f"予測処理中にエラーが発生しました: {e}", exc_info=True)
+      logger.error("予測処理中にエラーが発生しました: %s", e, exc_info=True)
       raise
-  def _prepare_input_data(self, request: RentPredictionRequest, features: list, scaler) -> np.ndarray:
+  async def predict_rent_async(self, request: RentPredictionRequest) -> RentPredictionResponse:
     """
-    特徴量リストに基づいて入力データを準備
+    家賃相場を予測する（同時に届いたリクエストは同一モデルごとにまとめて推論）
     Args:
       request: 予測リクエスト
-      features: 使用する特徴量のリスト
-      scaler: スケーラー
     Returns:
-      np.ndarray: 特徴量データ
+      RentPredictionResponse: 予測結果
     Raises:
       ValueError: 特徴量の抽出に失敗した場合
+      Exception: 予測処理中にエラーが発生した場合
     """
     try:
-      if not self.feature_mapper.validate_feature_list(features):
-        raise ValueError("無効な特徴量リストが指定されました")
-      expected_feature_count = scaler.n_features_in_
-      logger.debug(f"スケーラーが期待する特徴量数: {expected_feature_count}")
-      feature_values = self.feature_mapper.extract_features(request, features)
-      if len(feature_values) < expected_feature_count:
-        padding_needed = expected_feature_count - len(feature_values)
-        feature_values.extend([0.0] * padding_needed)
-        logger.warning(f"特徴量数が不足しているため、{padding_needed}個の0を追加しました")
-      elif len(feature_values) > expected_feature_count:
-        feature_values = feature_values[:expected_feature_count]
-        logger.warning(f"特徴量数が多すぎるため、{len(feature_values) - expected_feature_count}個を切り捨てました")
-      return np.array([feature_values], dtype=np.float32)
+      # モデルの初回読み込みや特徴量の抽出でイベントループをブロックしないよう、スレッドで実行する
+      predict_fn, features, model_info = await run_in_threadpool(self._prepare_batch_item, request)
+      stacked = get_stacked_predictor(model_info.model_type)
+      if stacked is not None and model_info.region in stacked.region_index:
+        # 地域別モデルをまとめた推論関数がある場合は、地域をまたいでバッチにまとめる
+        output = await self.batcher.predict(
+          model_info.model_type,
+          stacked,
+          features,
+          stacked.region_index[model_info.region]
+        )
+      else:
+        output = await self.batcher.predict(
+          (model_info.region, model_info.model_type),
+          predict_fn,
+          features
+        )
+      return self._build_response(request, model_info, float(output[0]))
     except Exception as e:
-      logger.error(f"入力データの準備に失敗しました: {e}")
-      raise ValueError(f"入力データの準備に失敗しました: {e}")
-  def _calculate_reasonable_range(self, predicted_rent: float) -> Dict[str, float]:
+      logger.error("予測処理中にエラーが発生しました: %s", e, exc_info=True)
+      raise
+  def _prepare_prediction(self, request: RentPredictionRequest) -> Tuple[Predictor, np.ndarray, ModelInfo]:
+    """
+    モデルを選択し、推論関数と入力データを準備
+    Args:
+      request: 予測リクエスト
+    Returns:
+      Tuple[Predictor, np.ndarray, ModelInfo]: 推論関数、入力データ、モデル情報
     """
-    適正価格範囲を計算
+    logger.debug("予測開始: region=%s, area=%s, age=%s", request.region, request.area, request.age)
+    model_info = get_model_info(request)
+    predict_fn = get_predict_fn(model_info.region, model_info.model_type)
+    extractors = self._get_extractors(model_info, predict_fn.n_features)
+    input_data = self._prepare_input_data(request, extractors)
+    logger.debug("予測実行中: 特徴量数=%s", len(model_info.features))
+    return predict_fn, input_data, model_info
+  def _prepare_batch_item(self, request: RentPredictionRequest) -> Tuple[Predictor, np.ndarray, ModelInfo]:
+    """
+    バッチ推論のキューに積む1件分の入力を準備
+    Args:
+      request: 予測リクエスト
+    Returns:
+      Tuple[Predictor, np.ndarray, ModelInfo]: 推論関数、1件分の特徴量（形状 (特徴量数,)）、モデル情報
+    """
+    predict_fn, input_data, model_info = self._prepare_prediction(request)
+    # 入力バッファはスレッドごとに再利用されるため、同じスレッド内でコピーする
+    return predict_fn, input_data[0].copy(), model_info
+  def _build_response(self, request: RentPredictionRequest, model_info: ModelInfo, predicted_rent: float) -> RentPredictionResponse:
+    """
+    予測家賃から相場分析を行い、レスポンスを作成
     Args:
+      request: 予測リクエスト
+      model_info: モデル情報
       predicted_rent: 予測家賃
     Returns:
-      Dict[str, float]: 適正価格範囲
+      RentPredictionResponse: 予測結果
     """
-    return {
-      "min": predicted_rent * 0.9,
-      "max": predicted_rent * 1.1
-    }
-  def _evaluate_price(self, current_rent: float, predicted_rent: float, reasonable_range: Dict[str, float]) -> int:
+    # 適正価格範囲（予測家賃の±10%）
+    lo = predicted_rent * 0.9
+    hi = predicted_rent * 1.1
+    reasonable_range = {"min": lo, "max": hi}
+    price_evaluation = self._evaluate_price(request.rent, predicted_rent, lo, hi)
+    logger.debug("予測完了: 予測家賃=%.2f, 評価=%s", predicted_rent, price_evaluation)
+    # 全ての値はサービス内で生成・検証済みのため、再検証せずに組み立てる
+    return RentPredictionResponse.model_construct(
+      input_conditions=request,
+      model_info=model_info.model_dump(),
+      predicted_rent=predicted_rent,
+      reasonable_range=reasonable_range,
+      price_evaluation=price_evaluation
+    )
+  def _get_extractors(self, model_info: ModelInfo, expected_feature_count: int) -> Tuple[Extractor, ...]:
+    """
+    モデルに対応する抽出関数を取得（初回のみ特徴量リストを検証し、モデルの入力形状に合わせて生成）
+    Args:
+      model_info: モデル情報
+      expected_feature_count: モデルが期待する特徴量数
+    Returns:
+      Tuple: 抽出関数のタプル
+    Raises:
+      ValueError: 無効な特徴量リストが指定された場合
+    """
+    key = (model_info.region, model_info.model_type)
+    extractors = self._extractors.get(key)
+    if extractors is None:
+      if not self.feature_mapper.validate_feature_list(model_info.features):
+        raise ValueError("無効な特徴量リストが指定されました")
+      extractors = self._extractors[key] = self.feature_mapper.compile_extractors(model_info.features, expected_feature_count)
+    return extractors
+  def _prepare_input_data(self, request: RentPredictionRequest, extractors: Tuple[Extractor, ...]) -> np.ndarray:
+    """
+    抽出関数に基づいて入力データを準備
+    Args:
+      request: 予測リクエスト
+      extractors: モデルの入力形状に合わせた抽出関数
+    Returns:
+      np.ndarray: 特徴量データ
+    Raises:
+      ValueError: 特徴量の抽出に失敗した場合
+    """
+    try:
+      return self.feature_mapper.extract_with(request, extractors)
+    except Exception as e:
+      logger.error("入力データの準備に失敗しました: %s", e)
+      raise ValueError(f"入力データの準備に失敗しました: {e}")
+  def _evaluate_price(self, current_rent: float, predicted_rent: float, lo: float, hi: float) -> int:
     """
     価格評価を判定（5段階）
     Args:
       current_rent: 現在の家賃
       predicted_rent: 予測家賃
-      reasonable_range: 適正価格範囲
+      lo: 適正価格範囲の下限
+      hi: 適正価格範囲の上限
     Returns:
       int: 価格評価（1:割安, 2:適正だが安い, 3:相場通り, 4:適正だが高い, 5:割高）
     """
-    if current_rent < reasonable_range["min"]:
-      return 1
-    elif current_rent < predicted_rent:
-      return 2
-    elif current_rent == predicted_rent:
-      return 3
-    elif current_rent <= reasonable_range["max"]:
-      return 4
-    else:
-      return 5
+    # 各境界を超えるごとに1段階ずつ上がる（予測家賃と等しい場合は >= のみ成立して 3 になる）
+    return (
+      1
+      + (current_rent >= lo)
+      + (current_rent >= predicted_rent)
+      + (current_rent > predicted_rent)
+      + (current_rent > hi)
+    )
 
 prediction_service = RentPredictionService()
 
@@ -111,6 +179,22 @@ def predict_rent(request: RentPredictionRequest) -> RentPredictionResponse:
   """後方互換性のための関数"""
   return prediction_service.predict_rent(request)
 
+async def predict_rent_async(request: RentPredictionRequest) -> RentPredictionResponse:
+  """バッチ推論を利用して家賃相場を予測する"""
+  return await prediction_service.predict_rent_async(request)
+
+async def shutdown_prediction_service() -> None:
+  """バッチ推論のワーカーを停止"""
+  await prediction_service.batcher.close()
+
 def prepare_input_data(request: RentPredictionRequest, features: list, scaler) -> np.ndarray:
-  """後方互換性のための関数"""
-  return prediction_service._prepare_input_data(request, features, scaler)
+  """
+  後方互換性のための関数
+
+  スケーラーの特徴量数（n_features_in_）に合わせて0埋め・切り捨てを行った、未スケールの入力データを返す。
+  """
+  if not FeatureMapper.validate_feature_list(features):
+    raise ValueError("無効な特徴量リストが指定されました")
+  extractors = FeatureMapper.compile_extractors(features, int(scaler.n_features_in_))
+  # 内部の入力バッファはスレッドごとに再利用されるため、呼び出し側にはコピーを返す
+  return prediction_service._prepare_input_data(request, extractors).copy()
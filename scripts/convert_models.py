@@ -0,0 +1,63 @@
+"""
+学習済みモデルを推論用の形式に変換するスクリプト
+
+saved_models/config.json に記載された全モデルについて、スケーラーを組み込んだモデルを
+次のいずれかの形式で model.keras と同じディレクトリに保存する。
+
+- tflite: 動的レンジ量子化した TFLite 形式（model.tflite）
+- saved_model: 推論用シグネチャのみを持つ SavedModel 形式（saved_model/）
+
+変換済みのファイルがある場合、APIは tflite、saved_model、model.keras の順に優先して使用する。
+スケーラーやモデルを更新した場合は、このスクリプトを再実行すること。
+
+使い方:
+  PYTHONPATH=. python scripts/convert_models.py [--format {tflite,saved_model}]
+"""
+import argparse
+import tensorflow as tf
+from app.core.model_loader import ModelLoader
+
+def convert_to_tflite(model: tf.keras.Model, output_path: str) -> None:
+  """
+  モデルを動的レンジ量子化した TFLite 形式で保存
+
+  Args:
+    model: 変換するモデル（標準化層を含む）
+    output_path: 出力先のパス
+  """
+  converter = tf.lite.TFLiteConverter.from_keras_model(model)
+  converter.optimizations = [tf.lite.Optimize.DEFAULT]
+  with open(output_path, "wb") as f:
+    f.write(converter.convert())
+
+def export_saved_model(model: tf.keras.Model, output_path: str) -> None:
+  """
+  モデルを推論用の SavedModel 形式で保存
+
+  Args:
+    model: 変換するモデル（標準化層を含む）
+    output_path: 出力先のディレクトリ
+  """
+  model.export(output_path)
+
+def main() -> None:
+  """config.json に記載された全モデルを変換"""
+  parser = argparse.ArgumentParser(description="学習済みモデルを推論用の形式に変換")
+  parser.add_argument("--format", choices=["tflite", "saved_model"], default="tflite")
+  args = parser.parse_args()
+
+  loader = ModelLoader()
+  config = loader.load_config()
+  for region, region_config in config.regions.items():
+    for model_type in region_config.models:
+      model = loader.get_model(region, model_type)
+      if args.format == "tflite":
+        output_path = loader.get_tflite_path(region, model_type)
+        convert_to_tflite(model, output_path)
+      else:
+        output_path = loader.get_saved_model_path(region, model_type)
+        export_saved_model(model, output_path)
+      print(f"変換しました: {output_path}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,27 @@
+"""
+config.json を検証済みの AppConfig として config.pkl に保存するスクリプト
+
+API起動時は config.pkl が config.json より新しければそちらを読み込み、
+Pydantic による検証を省略する。config.json を更新した場合は再実行すること。
+
+使い方:
+  PYTHONPATH=. python scripts/freeze_config.py
+"""
+import json
+import os
+import pickle
+from app.core.model_loader import SAVED_MODELS_DIR
+from app.models.config import AppConfig
+
+def main() -> None:
+  """config.json を検証して config.pkl に保存"""
+  config_path = SAVED_MODELS_DIR / "config.json"
+  frozen_path = SAVED_MODELS_DIR / "config.pkl"
+  with open(config_path, 'r', encoding='utf-8') as f:
+    config = AppConfig(**json.load(f))
+  with open(frozen_path, 'wb') as f:
+    pickle.dump(config, f, protocol=5)
+  print(f"保存しました: {os.fspath(frozen_path)}")
+
+if __name__ == "__main__":
+  main()
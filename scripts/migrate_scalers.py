@@ -0,0 +1,40 @@
+"""
+scaler.pkl（joblib形式の StandardScaler）を scaler.npz に変換するスクリプト
+
+saved_models/ 配下の全ての scaler.pkl について、transform で使われる平均と標準偏差を
+取り出し、同じディレクトリに scaler.npz として保存する。
+
+使い方:
+  PYTHONPATH=. python scripts/migrate_scalers.py [saved_models のパス]
+"""
+import os
+import sys
+import joblib
+import numpy as np
+from app.core.model_loader import SAVED_MODELS_DIR, scaler_mean_scale
+
+def migrate_scaler(pkl_path: str) -> str:
+  """
+  1つの scaler.pkl を scaler.npz に変換
+
+  Args:
+    pkl_path: scaler.pkl のパス
+
+  Returns:
+    str: 作成した scaler.npz のパス
+  """
+  mean, scale = scaler_mean_scale(joblib.load(pkl_path))
+  npz_path = os.path.splitext(pkl_path)[0] + ".npz"
+  np.savez(npz_path, mean=mean, scale=scale)
+  return npz_path
+
+def main() -> None:
+  """saved_models 配下の全スケーラーを変換"""
+  base_path = sys.argv[1] if len(sys.argv) > 1 else os.fspath(SAVED_MODELS_DIR)
+  for root, _, files in os.walk(base_path):
+    if "scaler.pkl" in files:
+      npz_path = migrate_scaler(os.path.join(root, "scaler.pkl"))
+      print(f"変換しました: {npz_path}")
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,79 @@
+import asyncio
+import numpy as np
+import pytest
+from app.services.batching import PredictionBatcher
+
+def _double(batch: np.ndarray) -> np.ndarray:
+  return batch * 2
+
+def test_concurrent_requests_are_batched():
+  calls = []
+  def predict_fn(batch):
+    calls.append(len(batch))
+    return batch.sum(axis=1, keepdims=True)
+
+  async def run():
+    batcher = PredictionBatcher(max_batch_size=8)
+    try:
+      return await asyncio.gather(*(
+        batcher.predict("key", predict_fn, np.full(3, i, dtype=np.float32))
+        for i in range(5)
+      ))
+    finally:
+      await batcher.close()
+
+  outputs = asyncio.run(run())
+  assert [float(output[0]) for output in outputs] == [0.0, 3.0, 6.0, 9.0, 12.0]
+  assert sum(calls) == 5
+  assert len(calls) < 5
+
+def test_batch_assembly_error_fails_requests_and_keeps_worker_alive():
+  async def run():
+    batcher = PredictionBatcher(max_batch_size=8)
+    try:
+      # 形状の異なる特徴量は np.stack で失敗する
+      results = await asyncio.gather(
+        batcher.predict("key", _double, np.zeros(3, dtype=np.float32)),
+        batcher.predict("key", _double, np.zeros(4, dtype=np.float32)),
+        return_exceptions=True
+      )
+      assert all(isinstance(result, ValueError) for result in results)
+      # 同じキューへの後続のリクエストも処理される
+      return await asyncio.wait_for(
+        batcher.predict("key", _double, np.ones(2, dtype=np.float32)),
+        timeout=5
+      )
+    finally:
+      await batcher.close()
+
+  np.testing.assert_array_equal(asyncio.run(run()), [2.0, 2.0])
+
+def test_dead_worker_is_restarted():
+  async def run():
+    batcher = PredictionBatcher()
+    try:
+      await batcher.predict("key", _double, np.ones(1, dtype=np.float32))
+      batcher._workers["key"].cancel()
+      await asyncio.sleep(0)
+      return await asyncio.wait_for(
+        batcher.predict("key", _double, np.ones(1, dtype=np.float32)),
+        timeout=5
+      )
+    finally:
+      await batcher.close()
+
+  np.testing.assert_array_equal(asyncio.run(run()), [2.0])
+
+def test_prediction_error_is_propagated():
+  def fail(batch):
+    raise RuntimeError("boom")
+
+  async def run():
+    batcher = PredictionBatcher()
+    try:
+      await batcher.predict("key", fail, np.ones(1, dtype=np.float32))
+    finally:
+      await batcher.close()
+
+  with pytest.raises(RuntimeError, match="boom"):
+    asyncio.run(run())
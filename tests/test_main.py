@@ -0,0 +1,55 @@
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.main import app, _etag_matches
+from app.models.schemas import RentPredictionRequest
+
+# 本文をモデルとして受け取る従来のエンドポイント（422 の形式の比較用）
+_reference_app = FastAPI()
+
+@_reference_app.post("/api/v1/predict")
+async def _reference_predict(request: RentPredictionRequest):
+  return {}
+
+VALID_BODY = {
+  "area": 25.0,
+  "age": 10,
+  "layout": 1,
+  "station_person": 50,
+  "rent": 8.5,
+  "region": "suginami"
+}
+
+@pytest.mark.parametrize("kwargs", [
+  {"content": b""},
+  {"json": {}},
+  {"json": {**VALID_BODY, "area": -1}},
+  {"json": {**VALID_BODY, "layout": 13, "age": "old"}},
+  {"json": {key: value for key, value in VALID_BODY.items() if key != "region"}},
+  {"json": {**VALID_BODY, "management_fee": -0.5, "total_units": 0}},
+  {"content": b"\xff", "headers": {"Content-Type": "application/json"}},
+  {"content": b'{"area": 25.0,', "headers": {"Content-Type": "application/json"}},
+  {"content": orjson.dumps(VALID_BODY), "headers": {"Content-Type": "text/plain"}},
+])
+def test_predict_validation_error_matches_fastapi(kwargs):
+  expected = TestClient(_reference_app).post("/api/v1/predict", **kwargs)
+  actual = TestClient(app).post("/api/v1/predict", **kwargs)
+  # 不正な本文は 422（UTF-8 として解釈できない場合は FastAPI が 400）で拒否される
+  assert expected.status_code in (400, 422)
+  assert actual.status_code == expected.status_code
+  assert actual.json() == expected.json()
+
+@pytest.mark.parametrize("header, expected", [
+  (None, False),
+  ("", False),
+  ('"abc"', True),
+  ('"xyz"', False),
+  ('W/"abc"', True),
+  ('"xyz", W/"abc"', True),
+  ('"xyz" ,"abc"', True),
+  ("*", True),
+  ("abc", False),
+])
+def test_etag_matches(header, expected):
+  assert _etag_matches(header, '"abc"') is expected
@@ -0,0 +1,82 @@
+import json
+import os
+import pickle
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.core import model_loader
+from app.core.model_loader import ModelLoader
+from app.models.config import AppConfig
+
+CONFIG = {
+  "regions": {
+    "suginami": {
+      "name": "杉並区",
+      "description": "杉並区のモデル",
+      "models": {
+        "base": {
+          "description": "基本モデル",
+          "features": ["area", "age", "layout", "station_person"],
+          "required_features": ["area", "age", "layout", "station_person"],
+          "optional_features": []
+        }
+      }
+    }
+  },
+  "model_format": "keras",
+  "scaler_format": "npz",
+  "last_updated": "2024-01-01"
+}
+
+def _missing_attribute_config() -> AppConfig:
+  config = AppConfig(**CONFIG)
+  del config.regions["suginami"].__dict__["description"]
+  return config
+
+@pytest.fixture
+def loader(tmp_path, monkeypatch):
+  monkeypatch.setattr(model_loader, "_config_cache", None)
+  monkeypatch.setattr(model_loader, "_model_type_dispatch", {})
+  with open(tmp_path / "config.json", "w", encoding="utf-8") as f:
+    json.dump(CONFIG, f)
+  loader = ModelLoader()
+  loader.base_path = os.fspath(tmp_path)
+  return loader
+
+def _write_frozen(tmp_path, data: bytes) -> None:
+  frozen_path = tmp_path / "config.pkl"
+  frozen_path.write_bytes(data)
+  # config.json より新しいファイルとして扱わせる
+  mtime = os.path.getmtime(tmp_path / "config.json") + 10
+  os.utime(frozen_path, (mtime, mtime))
+
+def test_load_config_uses_frozen_config(loader, tmp_path):
+  frozen = AppConfig(**CONFIG)
+  frozen.last_updated = "frozen"
+  _write_frozen(tmp_path, pickle.dumps(frozen))
+  assert loader.load_config().last_updated == "frozen"
+
+@pytest.mark.parametrize("data", [
+  b"not a pickle",
+  pickle.dumps({"regions": {}}),
+  pickle.dumps(_missing_attribute_config()),
+])
+def test_load_config_falls_back_to_json_for_unusable_frozen_config(loader, tmp_path, data):
+  _write_frozen(tmp_path, data)
+  config = loader.load_config()
+  assert isinstance(config, AppConfig)
+  assert config.regions["suginami"].description == "杉並区のモデル"
+
+@pytest.mark.parametrize("attributes, expected_mean, expected_scale", [
+  ({"with_mean": True, "with_std": True, "mean_": [1.0, 2.0], "scale_": [3.0, 4.0]}, [1.0, 2.0], [3.0, 4.0]),
+  # with_mean=False でも mean_ は計算されるが、transform では引かれない
+  ({"with_mean": False, "with_std": True, "mean_": [1.0, 2.0], "scale_": [3.0, 4.0]}, [0.0, 0.0], [3.0, 4.0]),
+  ({"with_mean": True, "with_std": False, "mean_": [1.0, 2.0], "scale_": None}, [1.0, 2.0], [1.0, 1.0]),
+  ({"with_mean": False, "with_std": False, "mean_": None, "scale_": None}, [0.0, 0.0], [1.0, 1.0]),
+])
+def test_scaler_mean_scale_follows_transform(attributes, expected_mean, expected_scale):
+  scaler = SimpleNamespace(n_features_in_=2, **attributes)
+  mean, scale = model_loader.scaler_mean_scale(scaler)
+  assert mean.dtype == scale.dtype == np.float32
+  np.testing.assert_array_equal(mean, expected_mean)
+  np.testing.assert_array_equal(scale, expected_scale)
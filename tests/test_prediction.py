@@ -0,0 +1,95 @@
+import asyncio
+from types import SimpleNamespace
+import numpy as np
+import pytest
+from app.core.predictors import Predictor
+from app.models.config import ModelInfo
+from app.models.schemas import RentPredictionRequest
+from app.services import prediction
+from app.services.prediction import RentPredictionService, prediction_service, prepare_input_data
+
+PREDICTED = 10.0
+LO = PREDICTED * 0.9
+HI = PREDICTED * 1.1
+
+@pytest.mark.parametrize("current_rent, expected", [
+  (5.0, 1),           # 適正価格範囲の下限未満
+  (LO - 1e-9, 1),
+  (LO, 2),            # 下限ちょうど
+  (9.5, 2),           # 下限以上・予測家賃未満
+  (PREDICTED, 3),     # 予測家賃と等しい
+  (10.5, 4),          # 予測家賃超・上限以下
+  (HI, 4),            # 上限ちょうど
+  (HI + 1e-9, 5),
+  (20.0, 5),          # 上限超
+])
+def test_evaluate_price(current_rent, expected):
+  evaluation = prediction_service._evaluate_price(current_rent, PREDICTED, LO, HI)
+  assert evaluation == expected
+  assert type(evaluation) is int
+
+@pytest.mark.parametrize("n_features_in, expected", [
+  (4, [[25.0, 10.0, 1.0, 50.0]]),
+  (6, [[25.0, 10.0, 1.0, 50.0, 0.0, 0.0]]),
+  (2, [[25.0, 10.0]]),
+])
+def test_prepare_input_data_uses_scaler_width(n_features_in, expected):
+  request = RentPredictionRequest(area=25.0, age=10, layout=1, station_person=50, rent=8.5, region="suginami")
+  scaler = SimpleNamespace(n_features_in_=n_features_in)
+  features = ["area", "age", "layout", "station_person"]
+  input_data = prepare_input_data(request, features, scaler)
+  assert input_data.dtype == np.float32
+  np.testing.assert_array_equal(input_data, expected)
+
+class _RecordingPredictor(Predictor):
+  """呼び出された入力を記録し、一定の予測値を返す推論関数"""
+  n_features = 4
+
+  def __init__(self):
+    self.calls = []
+
+  def __call__(self, x, region_ids=None):
+    self.calls.append(region_ids)
+    return np.full((len(x), 1), PREDICTED, dtype=np.float32)
+
+@pytest.mark.parametrize("stacked_regions, expected_path", [
+  (["setagaya", "suginami"], "stacked"),
+  (["setagaya"], "regional"),
+  (None, "regional"),
+])
+def test_predict_rent_async_selects_predictor(monkeypatch, stacked_regions, expected_path):
+  regional = _RecordingPredictor()
+  stacked = _RecordingPredictor()
+  if stacked_regions is not None:
+    stacked.region_index = {region: i for i, region in enumerate(stacked_regions)}
+  model_info = ModelInfo(
+    region="suginami",
+    region_name="杉並区",
+    model_type="base",
+    features=["area", "age", "layout", "station_person"],
+    description="基本モデル"
+  )
+  monkeypatch.setattr(prediction, "get_model_info", lambda request: model_info)
+  monkeypatch.setattr(prediction, "get_predict_fn", lambda region, model_type: regional)
+  monkeypatch.setattr(
+    prediction,
+    "get_stacked_predictor",
+    lambda model_type: stacked if stacked_regions is not None else None
+  )
+  request = RentPredictionRequest(area=25.0, age=10, layout=1, station_person=50, rent=8.5, region="suginami")
+
+  async def run():
+    service = RentPredictionService()
+    try:
+      return await service.predict_rent_async(request)
+    finally:
+      await service.batcher.close()
+
+  response = asyncio.run(run())
+  assert response.predicted_rent == PREDICTED
+  if expected_path == "stacked":
+    assert regional.calls == []
+    assert [list(region_ids) for region_ids in stacked.calls] == [[1]]
+  else:
+    assert regional.calls == [None]
+    assert stacked.calls == []
@@ -0,0 +1,86 @@
+import numpy as np
+import tensorflow as tf
+from app.core.predictors import DensePredictor
+from app.core.stacked_model import build_stacked_predictor, extract_dense_stack, fold_normalization
+
+N_FEATURES = 6
+
+def _build_model(seed: int) -> tf.keras.Model:
+  """ModelLoader と同じく、学習済みモデルの前段に Normalization 層を結合したモデルを作成"""
+  rng = np.random.default_rng(seed)
+  inner = tf.keras.Sequential([
+    tf.keras.Input(shape=(N_FEATURES,)),
+    tf.keras.layers.Dense(16, activation="relu"),
+    tf.keras.layers.Dense(8, activation="tanh"),
+    tf.keras.layers.Dense(1)
+  ])
+  inner.set_weights([rng.normal(size=w.shape).astype(np.float32) for w in inner.get_weights()])
+  mean = rng.normal(50.0, 20.0, size=N_FEATURES).astype(np.float32)
+  scale = rng.uniform(0.5, 30.0, size=N_FEATURES).astype(np.float32)
+  return tf.keras.Sequential([
+    tf.keras.Input(shape=(N_FEATURES,)),
+    tf.keras.layers.Normalization(axis=-1, mean=mean, variance=np.square(scale)),
+    inner
+  ])
+
+def _inputs(n: int) -> np.ndarray:
+  rng = np.random.default_rng(0)
+  return rng.normal(50.0, 25.0, size=(n, N_FEATURES)).astype(np.float32)
+
+def test_fold_normalization_matches_normalized_first_layer():
+  stack = extract_dense_stack(_build_model(1))
+  x = _inputs(16)
+  first = stack.layers[0]
+  expected = ((x - stack.mean) * stack.inv_std) @ first.kernel + first.bias
+  folded = fold_normalization(stack)[0]
+  np.testing.assert_allclose(x @ folded.kernel + folded.bias, expected, rtol=1e-4, atol=1e-4)
+
+def test_dense_predictor_matches_keras_model():
+  model = _build_model(2)
+  predictor = DensePredictor(extract_dense_stack(model))
+  x = _inputs(16)
+  assert predictor.n_features == N_FEATURES
+  np.testing.assert_allclose(predictor(x), model(x, training=False).numpy(), rtol=1e-4, atol=1e-4)
+  np.testing.assert_allclose(predictor(x[:1]), model(x[:1], training=False).numpy(), rtol=1e-4, atol=1e-4)
+
+def test_stacked_predictor_matches_each_regional_model():
+  models = {"a": _build_model(3), "b": _build_model(4), "c": _build_model(5)}
+  stacked = build_stacked_predictor(models)
+  assert stacked is not None
+  x = _inputs(9)
+  regions = ["a", "b", "c"] * 3
+  outputs = stacked(x, [stacked.region_index[region] for region in regions])
+  for i, region in enumerate(regions):
+    expected = models[region](x[i:i + 1], training=False).numpy()
+    np.testing.assert_allclose(outputs[i:i + 1], expected, rtol=1e-4, atol=1e-4)
+
+def test_stacked_predictor_matches_regional_model_for_single_region_batch():
+  models = {"a": _build_model(3), "b": _build_model(4)}
+  stacked = build_stacked_predictor(models)
+  x = _inputs(4)
+  outputs = stacked(x, [stacked.region_index["b"]] * 4)
+  assert isinstance(outputs, np.ndarray)
+  np.testing.assert_allclose(outputs, models["b"](x, training=False).numpy(), rtol=1e-4, atol=1e-4)
+
+def _wrap(inner: tf.keras.Model) -> tf.keras.Model:
+  return tf.keras.Sequential([
+    tf.keras.Input(shape=(N_FEATURES,)),
+    tf.keras.layers.Normalization(axis=-1, mean=np.zeros(N_FEATURES), variance=np.ones(N_FEATURES)),
+    inner
+  ])
+
+def test_functional_model_with_branches_is_not_extracted():
+  inputs = tf.keras.Input(shape=(N_FEATURES,))
+  left = tf.keras.layers.Dense(4, activation="relu")(inputs)
+  right = tf.keras.layers.Dense(4, activation="tanh")(inputs)
+  outputs = tf.keras.layers.Dense(1)(tf.keras.layers.Add()([left, right]))
+  assert extract_dense_stack(_wrap(tf.keras.Model(inputs, outputs))) is None
+
+def test_functional_model_with_only_dense_layers_is_not_extracted():
+  # 標準化層と全結合層のみだが、2つの出力に分岐しているため一列には計算できない
+  inputs = tf.keras.Input(shape=(N_FEATURES,))
+  normalized = tf.keras.layers.Normalization(axis=-1, mean=np.zeros(N_FEATURES), variance=np.ones(N_FEATURES))(inputs)
+  hidden = tf.keras.layers.Dense(4, activation="relu")(normalized)
+  output = tf.keras.layers.Dense(1)(hidden)
+  side = tf.keras.layers.Dense(4)(normalized)
+  assert extract_dense_stack(tf.keras.Model(inputs, [output, side])) is None